@@ -0,0 +1,147 @@
+"""Async facade over :mod:`database` for the ``async def`` route handlers.
+
+``sqlite3`` calls block, so running them straight from a coroutine stalls the
+event loop for every other request in the worker. The helpers below run them
+on dedicated, bounded thread pools instead: reads on as many threads as there
+are pooled reader connections, writes on a single thread that matches the
+single writer connection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import config
+import database
+from database import ProductData
+
+T = TypeVar("T")
+
+_read_executor: Optional[ThreadPoolExecutor] = None
+_write_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def start(workers: Optional[int] = None) -> None:
+    """Create the executors; called from the application lifespan."""
+
+    global _read_executor, _write_executor
+    with _executor_lock:
+        if _read_executor is None:
+            _read_executor = ThreadPoolExecutor(
+                max_workers=workers or config.DB_EXECUTOR_WORKERS,
+                thread_name_prefix="db-read",
+            )
+        if _write_executor is None:
+            _write_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="db-write"
+            )
+
+
+def shutdown() -> None:
+    """Wait for queued queries to finish and stop the executors."""
+
+    global _read_executor, _write_executor
+    with _executor_lock:
+        for executor in (_read_executor, _write_executor):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        _read_executor = None
+        _write_executor = None
+
+
+def _executors() -> tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+    if _read_executor is None or _write_executor is None:
+        start()
+    assert _read_executor is not None and _write_executor is not None
+    return _read_executor, _write_executor
+
+
+def _with_reader(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    with database.get_connection() as connection:
+        return func(connection, *args, **kwargs)
+
+
+def _with_writer(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    with database.get_write_connection() as connection:
+        return func(connection, *args, **kwargs)
+
+
+async def run_read(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``func(connection, *args, **kwargs)`` on a read-only connection."""
+
+    executor, _ = _executors()
+    loop = asyncio.get_running_loop()
+    call = functools.partial(_with_reader, func, *args, **kwargs)
+    return await loop.run_in_executor(executor, call)
+
+
+async def run_write(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``func(connection, *args, **kwargs)`` on the writer connection."""
+
+    _, executor = _executors()
+    loop = asyncio.get_running_loop()
+    call = functools.partial(_with_writer, func, *args, **kwargs)
+    return await loop.run_in_executor(executor, call)
+
+
+async def fetch_all_products(*, derived: bool = False) -> List[Dict[str, object]]:
+    return await run_read(database.fetch_all_products, derived=derived)
+
+
+async def fetch_product_by_id(
+    product_id: int, *, derived: bool = False
+) -> Optional[Dict[str, object]]:
+    return await run_read(database.fetch_product_by_id, product_id, derived=derived)
+
+
+async def fetch_category_heads(per_category: int) -> List[Dict[str, object]]:
+    return await run_read(database.fetch_category_heads, per_category)
+
+
+async def fetch_category_group_page(
+    group_key: str, *, after: int = 0, limit: int
+) -> List[Dict[str, object]]:
+    return await run_read(
+        database.fetch_category_group_page, group_key, after=after, limit=limit
+    )
+
+
+async def fetch_price_neighbours(
+    price: Optional[float], slugs: Sequence[Optional[str]], *, window: int, head: int
+) -> List[Dict[str, object]]:
+    return await run_read(
+        database.fetch_price_neighbours, price, slugs, window=window, head=head
+    )
+
+
+async def search_products(
+    match: str, *, limit: int, offset: int = 0
+) -> Tuple[List[Dict[str, object]], int]:
+    return await run_read(database.search_products, match, limit=limit, offset=offset)
+
+
+async def search_product_ids(match: str, *, limit: int) -> List[int]:
+    return await run_read(database.search_product_ids, match, limit=limit)
+
+
+async def create_product(data: ProductData) -> int:
+    """Insert a product; raises :class:`sqlite3.IntegrityError` on duplicates."""
+
+    return await run_write(database.create_product, data)
+
+
+async def update_product(product_id: int, data: ProductData) -> bool:
+    return await run_write(database.update_product, product_id, data)
+
+
+async def delete_product(product_id: int) -> bool:
+    return await run_write(database.delete_product, product_id)
+
+
+async def upsert_products(items: List[ProductData]) -> int:
+    return await run_write(database.upsert_products, items)
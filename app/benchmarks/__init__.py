@@ -0,0 +1,2 @@
+"""Stand-alone performance checks; run them from the ``app`` directory,
+e.g. ``python -m benchmarks.async_db``."""
@@ -0,0 +1,79 @@
+"""Compare blocking and executor-backed queries under concurrent load.
+
+Each simulated request loads the whole catalog while a probe coroutine
+measures how long the event loop is unavailable to other requests.
+
+    python -m benchmarks.async_db [products] [concurrency]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, List
+
+import async_db
+import database
+from benchmarks.common import temporary_catalog
+
+
+async def _blocking_request() -> None:
+    with database.get_connection() as connection:
+        database.fetch_all_products(connection)
+
+
+async def _executor_request() -> None:
+    await async_db.fetch_all_products()
+
+
+async def _probe(stop: asyncio.Event, delays: List[float]) -> None:
+    interval = 0.001
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        delays.append(time.perf_counter() - started - interval)
+
+
+async def _run(request: Callable[[], Awaitable[None]], concurrency: int) -> dict:
+    stop = asyncio.Event()
+    delays: List[float] = []
+    probe = asyncio.create_task(_probe(stop, delays))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return {
+        "wall": elapsed,
+        "rps": concurrency / elapsed,
+        "probe_p50_ms": statistics.median(delays) * 1000 if delays else 0.0,
+        "probe_max_ms": max(delays) * 1000 if delays else 0.0,
+    }
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    with temporary_catalog(count):
+        async_db.start()
+        try:
+            for label, request in (
+                ("blocking", _blocking_request),
+                ("executor", _executor_request),
+            ):
+                result = asyncio.run(_run(request, concurrency))
+                print(
+                    f"{label:>9}: {concurrency} requests over {count} rows in "
+                    f"{result['wall']:.3f} s ({result['rps']:.1f} req/s), "
+                    f"event loop stall p50 {result['probe_p50_ms']:.2f} ms, "
+                    f"max {result['probe_max_ms']:.2f} ms"
+                )
+        finally:
+            async_db.shutdown()
+
+
+if __name__ == "__main__":
+    main()
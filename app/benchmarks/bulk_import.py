@@ -0,0 +1,50 @@
+"""Measure import throughput in rows per second.
+
+Compares one commit per product (the admin form path) with the batched
+upsert used by the bulk import, both for fresh inserts and for re-importing
+the same rows as updates.
+
+    python -m benchmarks.bulk_import [rows]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from typing import Callable, List
+
+import database
+from benchmarks.common import synthetic_products, temporary_catalog
+from database import ProductData
+
+
+def _per_row(items: List[ProductData]) -> None:
+    with database.get_write_connection() as connection:
+        for item in items:
+            database.create_product(connection, item)
+
+
+def _batched(items: List[ProductData]) -> None:
+    with database.get_write_connection() as connection:
+        database.upsert_products(connection, items)
+
+
+def _measure(label: str, action: Callable[[], None], rows: int) -> None:
+    started = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - started
+    print(f"{label:>16}: {rows} rows in {elapsed:.3f} s ({rows / elapsed:,.0f} rows/s)")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    items = synthetic_products(count)
+    with temporary_catalog(0):
+        _measure("per-row commit", lambda: _per_row(items), count)
+    with temporary_catalog(0):
+        _measure("batched insert", lambda: _batched(items), count)
+        _measure("batched update", lambda: _batched(items), count)
+
+
+if __name__ == "__main__":
+    main()
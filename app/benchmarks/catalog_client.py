@@ -0,0 +1,37 @@
+"""Size and build time of the client-side catalog index.
+
+Reports the encoded ``/api/catalog-index`` body, raw and gzipped, and the
+time to build it; use it to pick ``CATALOG_CLIENT_INDEX_MAX``.
+
+    python -m benchmarks.catalog_client [products]
+"""
+
+from __future__ import annotations
+
+import gzip
+import sys
+import time
+
+from benchmarks.common import synthetic_rows
+from catalog_client import encode_client_index
+from catalog_index import CatalogIndex
+from view_helpers import build_product_views
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    views = build_product_views(synthetic_rows(count))
+    index = CatalogIndex(views)
+
+    started = time.perf_counter()
+    body = encode_client_index(1, views, index)
+    build_seconds = time.perf_counter() - started
+    compressed = len(gzip.compress(body))
+
+    print(f"{count} products")
+    print(f"     index: {len(body) / 1024:,.0f} KiB, {compressed / 1024:,.0f} KiB gzipped")
+    print(f"     build: {build_seconds * 1000:,.0f} ms, once per catalog version")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare the pure-Python ``CatalogIndex`` with the NumPy ``ColumnarCatalog``.
+
+Builds both engines over the same synthetic catalog and reports build time,
+the average time per filter query and the time for the price bounds and
+category facets. Needs NumPy installed.
+
+    python -m benchmarks.catalog_columns [products] [queries]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+from benchmarks.common import CATEGORIES, synthetic_rows
+from catalog_columns import ColumnarCatalog
+from catalog_index import CatalogIndex
+from view_helpers import CATALOG_SORT_OPTIONS, build_product_views, category_slug
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    views = build_product_views(synthetic_rows(count))
+
+    rng = random.Random(3)
+    slugs = [category_slug(name) for name in CATEGORIES]
+    mix = []
+    for _ in range(queries):
+        low = rng.randrange(3_000, 200_000, 1_000)
+        mix.append(
+            {
+                "categories": rng.sample(slugs, rng.randrange(0, 3)) or ["all"],
+                "sort": rng.choice(CATALOG_SORT_OPTIONS)["value"],
+                "price_from": rng.choice([None, low]),
+                "price_to": rng.choice([None, low + rng.randrange(10_000, 200_000)]),
+            }
+        )
+
+    print(f"{count} products, {queries} queries")
+    for label, engine_class in (("python", CatalogIndex), ("numpy", ColumnarCatalog)):
+        started = time.perf_counter()
+        engine = engine_class(views)
+        build_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for query in mix:
+            engine.query(**query)
+        query_seconds = (time.perf_counter() - started) / queries
+
+        started = time.perf_counter()
+        engine.price_bounds()
+        engine.categories()
+        facet_seconds = time.perf_counter() - started
+
+        print(
+            f"{label:>7}: build {build_seconds * 1000:,.0f} ms, "
+            f"{query_seconds * 1000:,.2f} ms per query, "
+            f"facets {facet_seconds * 1000:,.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
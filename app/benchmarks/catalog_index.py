@@ -0,0 +1,81 @@
+"""Compare ``apply_catalog_filters`` with ``CatalogIndex.query``.
+
+Runs the same mix of category, sort and price filters against both, and
+against the facet variants (``catalog_facets`` and ``CatalogIndex.facets``),
+and reports the index build time and the average time per query.
+
+    python -m benchmarks.catalog_index [products] [queries]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+from benchmarks.common import CATEGORIES, synthetic_rows
+from catalog_index import CatalogIndex
+from view_helpers import (
+    CATALOG_SORT_OPTIONS,
+    apply_catalog_filters,
+    build_product_views,
+    catalog_categories,
+    catalog_facets,
+    catalog_price_bounds,
+    category_slug,
+)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    views = build_product_views(synthetic_rows(count))
+
+    started = time.perf_counter()
+    index = CatalogIndex(views)
+    build_seconds = time.perf_counter() - started
+
+    rng = random.Random(3)
+    slugs = [category_slug(name) for name in CATEGORIES]
+    mix = []
+    for _ in range(queries):
+        low = rng.randrange(3_000, 200_000, 1_000)
+        mix.append(
+            {
+                "categories": rng.sample(slugs, rng.randrange(0, 3)) or ["all"],
+                "sort": rng.choice(CATALOG_SORT_OPTIONS)["value"],
+                "price_from": rng.choice([None, low]),
+                "price_to": rng.choice([None, low + rng.randrange(10_000, 200_000)]),
+            }
+        )
+
+    timings = {}
+    for label, run in (
+        ("scan + sort", lambda query: apply_catalog_filters(views, **query)),
+        ("index", lambda query: index.query(**query)),
+        (
+            "three scans",
+            lambda query: (
+                apply_catalog_filters(views, **query),
+                catalog_categories(views),
+                catalog_price_bounds(views),
+            ),
+        ),
+        ("single pass", lambda query: catalog_facets(views, **query)),
+        ("index facets", lambda query: index.facets(**query)),
+    ):
+        started = time.perf_counter()
+        for query in mix:
+            run(query)
+        timings[label] = (time.perf_counter() - started) / queries
+
+    print(
+        f"{count} products, {queries} queries; "
+        f"index built in {build_seconds * 1000:,.0f} ms"
+    )
+    for label, seconds in timings.items():
+        print(f"{label:>12}: {seconds * 1000:,.2f} ms per query")
+
+
+if __name__ == "__main__":
+    main()
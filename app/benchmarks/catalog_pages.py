@@ -0,0 +1,54 @@
+"""Catalog response size and time with and without pagination.
+
+Renders ``/catalog`` (page cache cleared before each request) once with
+every matching card in the page, as before pagination, and once with
+``config.CATALOG_PAGE_SIZE`` cards, then fetches one scroll fragment.
+
+    python -m benchmarks.catalog_pages [products]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+import config
+import main as application
+import page_cache
+from benchmarks.common import temporary_catalog
+
+
+def _timed_get(client: TestClient, url: str):
+    page_cache.cache.clear()
+    started = time.perf_counter()
+    response = client.get(url)
+    return response, time.perf_counter() - started
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    page_size = config.CATALOG_PAGE_SIZE
+
+    with temporary_catalog(count):
+        with TestClient(application.app) as client:
+            client.get("/catalog")  # build the catalog snapshot first
+            results = []
+            for label, size, url in (
+                ("all cards", count, "/catalog"),
+                (f"{page_size} per page", page_size, "/catalog"),
+                ("fragment", page_size, "/fragments/catalog?page=2"),
+            ):
+                config.CATALOG_PAGE_SIZE = size
+                response, seconds = _timed_get(client, url)
+                results.append((label, seconds, len(response.content)))
+            config.CATALOG_PAGE_SIZE = page_size
+
+    print(f"{count} products")
+    for label, seconds, size in results:
+        print(f"{label:>13}: {seconds * 1000:,.1f} ms, {size / 1024:,.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Measure how canonical catalog URLs improve cache hit rates.
+
+Generates requests for a handful of filter combinations, each spelled in
+many equivalent ways (case, order, repeated or comma-joined categories,
+explicit defaults, out-of-range prices, tracking parameters). It reports the
+hit rate a URL-keyed cache such as a browser or CDN would reach on the raw
+URLs and on the canonical ones, along with the server's page cache counters.
+
+    python -m benchmarks.catalog_urls [requests]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from typing import List, Tuple
+from urllib.parse import urlencode
+
+from fastapi.testclient import TestClient
+
+import main as application
+import page_cache
+from benchmarks.common import temporary_catalog
+
+FILTERS: Tuple[Tuple[Tuple[str, ...], str, Tuple[int, int]], ...] = (
+    ((), "price-asc", (0, 10**9)),
+    (("semeinye",), "price-asc", (0, 10**9)),
+    (("detskie", "standartnye"), "name", (0, 10**9)),
+    (("eksklyuzivnye",), "price-desc", (50_000, 200_000)),
+    ((), "category", (20_000, 80_000)),
+)
+
+
+def _variant(rng: random.Random, filters) -> str:
+    categories, sort, (low, high) = filters
+    slugs = [rng.choice([slug, slug.upper(), slug.title()]) for slug in categories]
+    rng.shuffle(slugs)
+    params: List[Tuple[str, str]] = []
+    if not slugs:
+        if rng.random() < 0.5:
+            params.append(("category", "all"))
+    elif rng.random() < 0.5:
+        params.append(("category", ",".join(slugs)))
+    else:
+        params.extend(("category", slug) for slug in slugs + slugs[:1])
+    if sort != "price-asc" or rng.random() < 0.5:
+        params.append(("sort", sort))
+    if low or rng.random() < 0.5:
+        params.append(("price_from", str(low or -rng.randrange(1, 1000))))
+    if high < 10**9 or rng.random() < 0.5:
+        params.append(("price_to", str(high if high < 10**9 else high + rng.randrange(1000))))
+    if rng.random() < 0.3:
+        params.append(("tm", str(rng.randrange(100))))
+    rng.shuffle(params)
+    return "/catalog?" + urlencode(params, safe=",") if params else "/catalog"
+
+
+def _hit_rate(keys: List[str]) -> float:
+    seen = set()
+    hits = 0
+    for key in keys:
+        if key in seen:
+            hits += 1
+        seen.add(key)
+    return hits / len(keys) if keys else 0.0
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    rng = random.Random(11)
+    urls = [_variant(rng, rng.choice(FILTERS)) for _ in range(count)]
+
+    with temporary_catalog(5_000):
+        with TestClient(application.app) as client:
+            canonical: List[str] = []
+            for url in urls:
+                response = client.get(url, follow_redirects=False)
+                if response.status_code == 302:
+                    location = response.headers["location"]
+                    client.get(location)
+                    canonical.append(location)
+                else:
+                    canonical.append(url)
+            stats = page_cache.stats()
+
+    print(f"{count} requests over {len(FILTERS)} filter combinations")
+    print(
+        f"      raw URLs: {len(set(urls)):>5} distinct, "
+        f"URL-keyed hit rate {_hit_rate(urls):.1%}"
+    )
+    print(
+        f"canonical URLs: {len(set(canonical)):>5} distinct, "
+        f"URL-keyed hit rate {_hit_rate(canonical):.1%}"
+    )
+    print(
+        f"    page cache: {stats['hits']} hits, {stats['misses']} misses, "
+        f"{stats['redirects']} redirects, hit rate {stats['hit_rate']:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
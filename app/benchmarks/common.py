@@ -0,0 +1,77 @@
+"""Helpers shared by the benchmark scripts."""
+
+from __future__ import annotations
+
+import random
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Generator, List
+
+import database
+from database import ProductData
+from view_helpers import derive_product_fields
+
+CATEGORIES = ("Стандартный", "Семейный", "Эксклюзивный", "Детский")
+NAME_WORDS = (
+    "Памятник", "Крест", "Стела", "Гранит", "Карельский", "Мрамор",
+    "Габбро", "Классика", "Династия", "Свет", "Память", "Вечность",
+)
+
+
+def synthetic_products(count: int, *, seed: int = 7) -> List[ProductData]:
+    rng = random.Random(seed)
+    products: List[ProductData] = []
+    for index in range(count):
+        words = rng.sample(NAME_WORDS, 3)
+        products.append(
+            ProductData(
+                name=f"{' '.join(words)} №{index}",
+                price=float(rng.randrange(3_000, 400_000, 100)),
+                description=f"{words[1]} из натурального камня.\nАртикул {index}.",
+                img_path=f"uploads/item_{index}.jpg",
+                category=rng.choice(CATEGORIES),
+            )
+        )
+    return products
+
+
+def synthetic_rows(count: int) -> List[Dict[str, object]]:
+    """Product rows with their derived columns, as the catalog reads them."""
+
+    rows: List[Dict[str, object]] = []
+    for index, product in enumerate(synthetic_products(count), start=1):
+        row: Dict[str, object] = {
+            "id": index,
+            "name": product.name,
+            "price": product.price,
+            "description": product.description,
+            "img_path": product.img_path,
+            "category": product.category,
+        }
+        row.update(
+            derive_product_fields(
+                product.name, product.price, product.description, product.category
+            )
+        )
+        rows.append(row)
+    return rows
+
+
+@contextmanager
+def temporary_catalog(count: int) -> Generator[database.Database, None, None]:
+    """Point :mod:`database` at a throw-away file filled with ``count`` rows."""
+
+    original_dir, original_path = database.DATA_DIR, database.DATABASE_PATH
+    with tempfile.TemporaryDirectory() as directory:
+        database.close_database()
+        database.DATA_DIR = Path(directory)
+        database.DATABASE_PATH = Path(directory) / "database.db"
+        try:
+            db = database.open_database()
+            with database.get_write_connection() as connection:
+                database.upsert_products(connection, synthetic_products(count))
+            yield db
+        finally:
+            database.close_database()
+            database.DATA_DIR, database.DATABASE_PATH = original_dir, original_path
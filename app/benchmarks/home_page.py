@@ -0,0 +1,72 @@
+"""Home page cost with bounded carousels versus the whole catalog.
+
+Times reading and grouping every product, as the home page used to, against
+``fetch_category_heads`` for the first carousel page of each category, and
+reports the size of the rendered home page.
+
+    python -m benchmarks.home_page [products] [repeats]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+import config
+import database
+import main as application
+import page_cache
+from benchmarks.common import temporary_catalog
+from view_helpers import build_product_views, ordered_categories
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    size = config.HOME_CAROUSEL_SIZE
+
+    with temporary_catalog(count):
+        timings = {}
+        for label, load in (
+            (
+                "whole catalog",
+                lambda db: ordered_categories(
+                    build_product_views(database.fetch_all_products(db, derived=True))
+                ),
+            ),
+            (
+                "category heads",
+                lambda db: ordered_categories(
+                    build_product_views(database.fetch_category_heads(db, size + 1)),
+                    size,
+                ),
+            ),
+        ):
+            with database.get_connection() as connection:
+                started = time.perf_counter()
+                for _ in range(repeats):
+                    groups = load(connection)
+                timings[label] = (
+                    (time.perf_counter() - started) / repeats,
+                    sum(len(group["items"]) for group in groups),
+                )
+
+        with TestClient(application.app) as client:
+            page_cache.cache.clear()
+            started = time.perf_counter()
+            response = client.get("/")
+            render_seconds = time.perf_counter() - started
+
+    print(f"{count} products, {size} per carousel")
+    for label, (seconds, items) in timings.items():
+        print(f"{label:>15}: {seconds * 1000:,.1f} ms, {items:,} products")
+    print(
+        f"{'home page':>15}: {render_seconds * 1000:,.1f} ms, "
+        f"{len(response.content) / 1024:,.0f} KiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
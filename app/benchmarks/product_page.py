@@ -0,0 +1,61 @@
+"""Product page data cost: whole catalog versus indexed point queries.
+
+For a sample of products, times loading the full catalog and building a
+``SimilarIndex`` over it against reading the product and its price windows
+with ``fetch_price_neighbours`` and scoring them with ``similar_among``.
+
+    python -m benchmarks.product_page [products] [pages]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+import config
+import database
+import similarity
+from benchmarks.common import temporary_catalog
+from view_helpers import build_product_views
+
+
+def _whole_catalog(db, product_id: int) -> int:
+    products = build_product_views(database.fetch_all_products(db, derived=True))
+    return len(similarity.SimilarIndex(products).similar(product_id))
+
+
+def _point_queries(db, product_id: int) -> int:
+    row = database.fetch_product_by_id(db, product_id, derived=True)
+    neighbours = database.fetch_price_neighbours(
+        db,
+        row["numeric_price"],
+        similarity.neighbour_scopes(str(row["category_slug"])),
+        window=similarity.candidate_window(config.SIMILAR_PRODUCTS_LIMIT),
+        head=similarity.candidate_head(config.SIMILAR_PRODUCTS_LIMIT),
+    )
+    return len(similarity.similar_among(product_id, [row, *neighbours])[1])
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with temporary_catalog(count):
+        with database.get_connection() as connection:
+            ids = [int(row["id"]) for row in connection.execute("SELECT id FROM products")]
+            sample = random.Random(9).sample(ids, min(pages, len(ids)))
+            print(f"{count} products, {len(sample)} product pages")
+            for label, load, repeat in (
+                ("whole catalog", _whole_catalog, sample[:2]),
+                ("point queries", _point_queries, sample),
+            ):
+                started = time.perf_counter()
+                for product_id in repeat:
+                    load(connection, product_id)
+                seconds = (time.perf_counter() - started) / len(repeat)
+                print(f"{label:>14}: {seconds * 1000:,.2f} ms per page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Memory per product and build/render-path timings for ``ProductView``.
+
+Rows carry the stored derived columns, as the catalog snapshot reads them.
+Reports traced memory per built view, the time to build the list, one
+``apply_catalog_filters`` pass per sort option and a pass over the fields
+the product tile template reads.
+
+    python -m benchmarks.product_views [products]
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import synthetic_rows
+from view_helpers import (
+    CATALOG_SORT_OPTIONS,
+    apply_catalog_filters,
+    build_product_views,
+)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = synthetic_rows(count)
+
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    views = build_product_views(rows)
+    build_seconds = time.perf_counter() - started
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for option in CATALOG_SORT_OPTIONS:
+        apply_catalog_filters(
+            views, categories=["all"], sort=option["value"], price_from=None, price_to=None
+        )
+    filter_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for view in views:
+        view.link, view.image_url, view.price_text, view.category_name
+    render_seconds = time.perf_counter() - started
+
+    print(f"{count} products")
+    print(f"  memory: {traced / count:,.0f} bytes per product ({traced / 2**20:,.1f} MiB)")
+    print(f"   build: {build_seconds * 1000:,.0f} ms")
+    print(f"   sorts: {filter_seconds * 1000:,.0f} ms for {len(CATALOG_SORT_OPTIONS)} sort options")
+    print(f"  fields: {render_seconds * 1000:,.0f} ms for one pass over tile fields")
+
+
+if __name__ == "__main__":
+    main()
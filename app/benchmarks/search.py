@@ -0,0 +1,76 @@
+"""Full-text search latency: FTS5 queries versus a Python scan.
+
+Fills a throw-away database, then for a mix of one- and two-word queries
+times a ranked ``/api/search`` page (``search_products``), the ranked ids the
+catalog page filters (``search_product_ids``) and, for comparison, loading
+every product and matching the same stems in Python.
+
+    python -m benchmarks.search [products] [queries]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+import config
+import database
+import search
+from benchmarks.common import NAME_WORDS, temporary_catalog
+
+
+def _python_scan(db, text: str) -> int:
+    terms = search.query_terms(text)
+    matches = 0
+    for row in database.fetch_all_products(db):
+        words = f"{row['name']} {row['description'] or ''}".lower().replace("ё", "е")
+        tokens = words.replace("\n", " ").split()
+        if all(any(token.startswith(term) for token in tokens) for term in terms):
+            matches += 1
+    return matches
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    rng = random.Random(5)
+    words = [word.lower() for word in NAME_WORDS] + ["карельского", "гранита"]
+    mix = [
+        " ".join(rng.sample(words, rng.choice((1, 2)))) for _ in range(queries)
+    ]
+
+    with temporary_catalog(count):
+        with database.get_connection() as connection:
+            print(f"{count} products, {queries} queries")
+            for label, run, repeat in (
+                (
+                    "fts page",
+                    lambda text: database.search_products(
+                        connection,
+                        search.match_query(text),
+                        limit=config.SEARCH_PAGE_SIZE,
+                    ),
+                    mix,
+                ),
+                (
+                    "fts ids",
+                    lambda text: database.search_product_ids(
+                        connection,
+                        search.match_query(text),
+                        limit=config.SEARCH_MAX_RESULTS,
+                    ),
+                    mix,
+                ),
+                ("python scan", lambda text: _python_scan(connection, text), mix[:3]),
+            ):
+                started = time.perf_counter()
+                for text in repeat:
+                    run(text)
+                seconds = (time.perf_counter() - started) / len(repeat)
+                print(f"{label:>12}: {seconds * 1000:,.2f} ms per query")
+
+
+if __name__ == "__main__":
+    main()
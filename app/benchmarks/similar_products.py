@@ -0,0 +1,48 @@
+"""Time ``SimilarIndex.similar``.
+
+Reports the index build time and the average time and list length per
+product page, first request and cached, for a sample of products.
+
+    python -m benchmarks.similar_products [products] [pages]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+from benchmarks.common import synthetic_rows
+from similarity import SimilarIndex
+from view_helpers import build_product_views
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    views = build_product_views(synthetic_rows(count))
+    sample = random.Random(5).sample(views, min(pages, len(views)))
+
+    started = time.perf_counter()
+    index = SimilarIndex(views)
+    build_seconds = time.perf_counter() - started
+
+    print(
+        f"{count} products, {len(sample)} pages; "
+        f"index built in {build_seconds * 1000:,.0f} ms"
+    )
+    for label, run in (
+        ("top-k", lambda product: index.similar(product.id)),
+        ("top-k cached", lambda product: index.similar(product.id)),
+    ):
+        started = time.perf_counter()
+        items = sum(len(run(product)) for product in sample)
+        seconds = (time.perf_counter() - started) / len(sample)
+        print(
+            f"{label:>13}: {seconds * 1000:,.3f} ms per page, "
+            f"{items / len(sample):,.0f} items"
+        )
+
+
+if __name__ == "__main__":
+    main()
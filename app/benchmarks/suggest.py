@@ -0,0 +1,60 @@
+"""Suggestion index build, update and lookup times.
+
+Builds the :mod:`suggest` index for a synthetic catalog, applies a one-product
+edit the way a new catalog version does, and times lookups for prefixes from
+one letter to whole words. Lookups should stay well under a millisecond.
+
+    python -m benchmarks.suggest [products] [lookups]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+import config
+import suggest
+from benchmarks.common import NAME_WORDS, synthetic_rows
+from view_helpers import build_product_views
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+
+    views = build_product_views(synthetic_rows(count))
+    suggestions = {
+        ("product", view.id): suggest._product_suggestion(view) for view in views
+    }
+
+    started = time.perf_counter()
+    index = suggest.SuggestIndex(suggestions, config.SUGGEST_LIMIT)
+    build_seconds = time.perf_counter() - started
+
+    edited = dict(suggestions)
+    edited[("product", views[0].id)] = suggestions[("product", views[0].id)]._replace(
+        text="Памятник «Новый»"
+    )
+    started = time.perf_counter()
+    index.updated(edited)
+    update_seconds = time.perf_counter() - started
+
+    rng = random.Random(3)
+    words = [word.lower() for word in NAME_WORDS]
+    prefixes = [
+        word[: rng.randint(1, len(word))] for word in rng.choices(words, k=lookups)
+    ]
+    started = time.perf_counter()
+    for prefix in prefixes:
+        index.suggest(prefix)
+    lookup_seconds = (time.perf_counter() - started) / lookups
+
+    print(f"{count} products")
+    print(f"     build: {build_seconds * 1000:,.0f} ms, on first use")
+    print(f"    update: {update_seconds * 1000:,.1f} ms for one changed product")
+    print(f"    lookup: {lookup_seconds * 1_000_000:,.1f} µs per prefix")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Read-through cache of the built catalog.
+
+The catalog changes a few times a day, yet every page used to re-query the
+products and rebuild their views. :func:`get_snapshot` keeps the built
+:class:`~view_helpers.ProductView` list together with the facets derived from
+it and rebuilds them only when :func:`database.catalog_version` moves.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+import async_db
+import database
+from catalog_columns import CatalogEngine, build_engine
+from view_helpers import (
+    DERIVED_PRODUCT_FIELDS,
+    ProductView,
+    build_product_views,
+)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Everything the public pages need, built from one read of the catalog."""
+
+    version: int
+    updated_at: Optional[int]
+    products: List[ProductView]
+    by_id: Dict[int, ProductView]
+    rows_by_id: Dict[int, Dict[str, object]]
+    updated_at_by_id: Dict[int, Optional[int]]
+    categories: List[dict]
+    bounds: Dict[str, int]
+    index: CatalogEngine
+
+
+@dataclass
+class CacheStats:
+    version: Optional[int]
+    products: int
+    hits: int
+    misses: int
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_build_lock = threading.Lock()
+_counter_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def _count(*, hit: bool) -> None:
+    global _hits, _misses
+    with _counter_lock:
+        if hit:
+            _hits += 1
+        else:
+            _misses += 1
+
+
+def _fresh() -> Optional[CatalogSnapshot]:
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == database.catalog_version():
+        return snapshot
+    return None
+
+
+def build_snapshot(
+    db: sqlite3.Connection, version: int, updated_at: Optional[int] = None
+) -> CatalogSnapshot:
+    rows = database.fetch_all_products(db, derived=True)
+    products = build_product_views(rows)
+    index = build_engine(products)
+    return CatalogSnapshot(
+        version=version,
+        updated_at=updated_at,
+        products=products,
+        by_id={product.id: product for product in products},
+        rows_by_id={
+            int(row["id"]): {
+                key: value
+                for key, value in row.items()
+                if key not in DERIVED_PRODUCT_FIELDS and key != "updated_at"
+            }
+            for row in rows
+        },
+        updated_at_by_id={int(row["id"]): row.get("updated_at") for row in rows},
+        categories=index.categories(),
+        bounds=index.price_bounds(),
+        index=index,
+    )
+
+
+def _load(db: sqlite3.Connection) -> CatalogSnapshot:
+    global _snapshot
+    with _build_lock:
+        snapshot = _fresh()
+        if snapshot is not None:
+            _count(hit=True)
+            return snapshot
+        _count(hit=False)
+        # Read the version before the rows: a write landing in between leaves
+        # the snapshot tagged with the older version, so it is rebuilt again.
+        snapshot = build_snapshot(db, *database.catalog_state())
+        _snapshot = snapshot
+        return snapshot
+
+
+async def get_snapshot() -> CatalogSnapshot:
+    """Return the current snapshot, rebuilding it on a reader thread if stale."""
+
+    snapshot = _fresh()
+    if snapshot is not None:
+        _count(hit=True)
+        return snapshot
+    return await async_db.run_read(_load)
+
+
+def clear() -> None:
+    """Drop the snapshot, e.g. when the database is closed."""
+
+    global _snapshot
+    with _build_lock:
+        _snapshot = None
+
+
+def stats() -> Dict[str, Optional[int]]:
+    snapshot = _snapshot
+    return asdict(
+        CacheStats(
+            version=snapshot.version if snapshot is not None else None,
+            products=len(snapshot.products) if snapshot is not None else 0,
+            hits=_hits,
+            misses=_misses,
+        )
+    )
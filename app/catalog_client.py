@@ -0,0 +1,82 @@
+"""Compact catalog index for filtering in the browser.
+
+Every category, sort or price change on ``/catalog`` used to reload the page.
+:func:`client_index` packs what the filters and a product card need into
+columns instead: one list per field, repeated strings (category slugs, price
+prefixes) as codes into a small table, and every sort order as a list of
+positions. ``catalog.js`` walks the order of the chosen sort and keeps the
+positions that pass the filters, which gives the same products, in the same
+order, as :func:`view_helpers.apply_catalog_filters`.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from catalog_columns import CatalogEngine
+from view_helpers import ProductView
+
+
+def _codes(values: Sequence[str]) -> Tuple[List[str], List[int]]:
+    """Replace ``values`` by positions in a table of their distinct values."""
+
+    table: List[str] = []
+    positions: Dict[str, int] = {}
+    codes: List[int] = []
+    for value in values:
+        code = positions.get(value)
+        if code is None:
+            code = len(table)
+            positions[value] = code
+            table.append(value)
+        codes.append(code)
+    return table, codes
+
+
+def _compact_price(value: Optional[float]) -> Optional[Union[int, float]]:
+    if value is None or not value.is_integer():
+        return value
+    return int(value)
+
+
+def client_index(
+    version: int, products: Sequence[ProductView], engine: CatalogEngine
+) -> Dict[str, object]:
+    """Columns of ``products`` (as the snapshot holds them) for ``catalog.js``.
+
+    ``prices`` are the numeric prices the price filter compares, ``null``
+    for unpriced products; ``orders`` come from ``engine`` and hold product
+    positions for ``price-asc``, ``category`` and ``name`` (``price-desc``
+    is ``price-asc`` reversed).
+    """
+
+    categories, category_codes = _codes(
+        [product.category_slug for product in products]
+    )
+    prefixes, prefix_codes = _codes(
+        [product.price_display.prefix for product in products]
+    )
+    return {
+        "version": version,
+        "ids": [product.id for product in products],
+        "names": [product.name for product in products],
+        "prices": [_compact_price(product.numeric_price) for product in products],
+        "price_prefixes": prefixes,
+        "price_prefix_codes": prefix_codes,
+        "price_texts": [product.price_display.text for product in products],
+        "images": [product.image_url for product in products],
+        "categories": categories,
+        "category_codes": category_codes,
+        "orders": engine.sort_orders(),
+    }
+
+
+def encode_client_index(
+    version: int, products: Sequence[ProductView], engine: CatalogEngine
+) -> bytes:
+    return json.dumps(
+        client_index(version, products, engine),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
@@ -0,0 +1,204 @@
+"""Optional NumPy-backed catalog engine for very large catalogs.
+
+:class:`ColumnarCatalog` keeps the catalog as columns: a float price array
+(NaN for unpriced products), an integer code per raw category value and
+precomputed sort ranks. Filtering, price bounds and category counts are
+vectorized masks and reductions instead of Python loops. It answers the same
+queries and facets as :class:`catalog_index.CatalogIndex` and the helpers in
+:mod:`view_helpers` with identical results.
+
+NumPy is not a hard dependency: :func:`build_engine` falls back to the
+pure-Python index when it is missing or the catalog is small.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Sequence, Union
+
+import config
+from catalog_index import CatalogIndex, SORT_KEYS
+from view_helpers import (
+    CatalogFacets,
+    ProductView,
+    catalog_categories_from_stats,
+    category_facet_counts,
+    price_bounds,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+
+class ColumnarCatalog:
+    """Column arrays over one catalog version, queried with NumPy masks."""
+
+    def __init__(self, products: Sequence[ProductView]) -> None:
+        if np is None:
+            raise RuntimeError("NumPy is required for the columnar catalog")
+
+        self.products: List[ProductView] = list(products)
+        count = len(self.products)
+        self.prices = np.array(
+            [
+                math.nan if product.numeric_price is None else product.numeric_price
+                for product in self.products
+            ],
+            dtype=np.float64,
+        )
+
+        # Codes follow the first appearance of each raw category value, which
+        # is the order ``catalog_categories`` expects its stats in.
+        self._categories: List[Optional[str]] = []
+        codes_by_category: Dict[Optional[str], int] = {}
+        codes = np.empty(count, dtype=np.int32)
+        self._codes_by_slug: Dict[str, List[int]] = {}
+        for position, product in enumerate(self.products):
+            code = codes_by_category.get(product.category)
+            if code is None:
+                code = len(self._categories)
+                codes_by_category[product.category] = code
+                self._categories.append(product.category)
+                slug_codes = self._codes_by_slug.setdefault(product.category_slug, [])
+                slug_codes.append(code)
+            codes[position] = code
+        self.category_codes = codes
+
+        self.ranks: Dict[str, "np.ndarray"] = {}
+        for sort, key in SORT_KEYS.items():
+            keys = [key(product) for product in self.products]
+            order = sorted(range(count), key=keys.__getitem__)
+            rank = np.empty(count, dtype=np.int64)
+            rank[order] = np.arange(count, dtype=np.int64)
+            self.ranks[sort] = rank
+
+        priced = self.prices[~np.isnan(self.prices)]
+        if priced.size == 0:
+            self._bounds = price_bounds(None, None)
+        else:
+            self._bounds = price_bounds(
+                float(priced.min()), max(0.0, float(priced.max()))
+            )
+        counts = np.bincount(self.category_codes, minlength=len(self._categories))
+        self._facet = catalog_categories_from_stats(
+            [
+                {"category": category, "count": int(counts[code])}
+                for code, category in enumerate(self._categories)
+            ]
+        )
+
+    def price_bounds(self) -> Dict[str, int]:
+        """Same as :func:`view_helpers.catalog_price_bounds`."""
+
+        return self._bounds
+
+    def categories(self) -> List[dict]:
+        """Same as :func:`view_helpers.catalog_categories`."""
+
+        return self._facet
+
+    def sort_orders(self) -> Dict[str, List[int]]:
+        """Same as :meth:`catalog_index.CatalogIndex.sort_orders`."""
+
+        return {
+            sort: np.argsort(rank, kind="stable").tolist()
+            for sort, rank in self.ranks.items()
+        }
+
+    def _price_mask(
+        self, price_from: Optional[int], price_to: Optional[int]
+    ) -> Optional["np.ndarray"]:
+        if price_from is None or price_to is None or price_to <= price_from:
+            return None
+        # NaN compares false, so unpriced products drop out like in Python.
+        return (self.prices >= price_from) & (self.prices <= price_to)
+
+    def facets(
+        self,
+        *,
+        categories: Sequence[str],
+        sort: str,
+        price_from: Optional[int],
+        price_to: Optional[int],
+    ) -> CatalogFacets:
+        """Same as :func:`view_helpers.catalog_facets`."""
+
+        products = self.query(
+            categories=categories,
+            sort=sort,
+            price_from=price_from,
+            price_to=price_to,
+        )
+        price_mask = self._price_mask(price_from, price_to)
+        if price_mask is None:
+            return CatalogFacets(products, self._facet, self._bounds)
+        by_code = np.bincount(
+            self.category_codes[price_mask], minlength=len(self._categories)
+        )
+        counts: Dict[str, int] = {
+            slug: int(by_code[codes].sum())
+            for slug, codes in self._codes_by_slug.items()
+        }
+        return CatalogFacets(
+            products, category_facet_counts(self._facet, counts), self._bounds
+        )
+
+    def query(
+        self,
+        *,
+        categories: Sequence[str],
+        sort: str,
+        price_from: Optional[int],
+        price_to: Optional[int],
+    ) -> List[ProductView]:
+        """Same as :func:`view_helpers.apply_catalog_filters`."""
+
+        mask = np.ones(len(self.products), dtype=bool)
+        slugs = {
+            slug.strip().lower()
+            for slug in categories
+            if slug and slug.strip().lower() != "all"
+        }
+        if slugs:
+            codes = [
+                code for slug in slugs for code in self._codes_by_slug.get(slug, ())
+            ]
+            mask &= np.isin(self.category_codes, codes)
+
+        price_mask = self._price_mask(price_from, price_to)
+        if price_mask is not None:
+            mask &= price_mask
+
+        order = sort if sort in SORT_KEYS or sort == "price-desc" else "price-asc"
+        rank = self.ranks["price-asc" if order == "price-desc" else order]
+        positions = np.flatnonzero(mask)
+        positions = positions[np.argsort(rank[positions])]
+        if order == "price-desc":
+            positions = positions[::-1]
+
+        products = self.products
+        return [products[position] for position in positions.tolist()]
+
+
+CatalogEngine = Union[CatalogIndex, ColumnarCatalog]
+
+
+def build_engine(products: Sequence[ProductView]) -> CatalogEngine:
+    """Pick the catalog engine per ``config.CATALOG_ENGINE``.
+
+    ``auto`` uses NumPy when it is installed and the catalog has at least
+    ``config.CATALOG_NUMPY_THRESHOLD`` products; ``numpy`` and ``python``
+    force one engine (``numpy`` still falls back when NumPy is missing).
+    """
+
+    engine = config.CATALOG_ENGINE
+    if NUMPY_AVAILABLE and (
+        engine == "numpy"
+        or (engine == "auto" and len(products) >= config.CATALOG_NUMPY_THRESHOLD)
+    ):
+        return ColumnarCatalog(products)
+    return CatalogIndex(products)
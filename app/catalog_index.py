@@ -0,0 +1,237 @@
+"""Precomputed orderings of the catalog for fast filtering.
+
+:func:`view_helpers.apply_catalog_filters` scans every product and sorts the
+matches on each request. :class:`CatalogIndex` does that work once per
+catalog version: every sort option gets a presorted list of product
+positions, for the whole catalog and for each category slug, and price range
+lookups bisect the price-ordered lists. A query is then a slice per selected
+category, merged by precomputed rank, and gives the same result as
+``apply_catalog_filters``. :meth:`CatalogIndex.facets` adds category counts
+under the price filter by bisecting each bucket, without building lists.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from view_helpers import (
+    CatalogFacets,
+    ProductView,
+    catalog_categories,
+    catalog_price_bounds,
+    category_facet_counts,
+)
+
+_PRICE_SORTS = ("price-asc", "price-desc")
+
+
+def _price_sort_key(product: ProductView) -> Tuple[float, str]:
+    value = product.numeric_price
+    if value is None:
+        return (math.inf, product.name_key)
+    return (int(value), product.name_key)
+
+
+SORT_KEYS: Dict[str, Callable[[ProductView], object]] = {
+    "price-asc": _price_sort_key,
+    "category": lambda product: (product.category_key, product.name_key),
+    "name": lambda product: product.name_key,
+}
+
+
+class _Group:
+    """Presorted positions of one product subset (all or one category)."""
+
+    __slots__ = ("orders", "price_keys")
+
+    def __init__(
+        self,
+        positions: List[int],
+        ranks: Dict[str, List[int]],
+        products: Sequence[ProductView],
+    ) -> None:
+        self.orders: Dict[str, List[int]] = {
+            sort: sorted(positions, key=rank.__getitem__)
+            for sort, rank in ranks.items()
+        }
+        self.price_keys: List[float] = [
+            _price_sort_key(products[position])[0]
+            for position in self.orders["price-asc"]
+        ]
+
+    def _price_span(
+        self, price_from: int, price_to: int
+    ) -> Tuple[int, int, int, int]:
+        keys = self.price_keys
+        start = bisect_left(keys, price_from)
+        stop = bisect_right(keys, price_to)
+        # Keys are truncated to whole roubles, so only products whose key
+        # equals a bound can have a price just outside the range.
+        low = bisect_right(keys, price_from, start, stop)
+        high = max(low, bisect_left(keys, price_to, start, stop))
+        return start, low, high, stop
+
+    def price_slice(
+        self, products: Sequence[ProductView], price_from: int, price_to: int
+    ) -> List[int]:
+        """Positions priced within ``[price_from, price_to]``, in price order."""
+
+        order = self.orders["price-asc"]
+        start, low, high, stop = self._price_span(price_from, price_to)
+
+        def inside(position: int) -> bool:
+            return price_from <= products[position].numeric_price <= price_to
+
+        return (
+            [position for position in order[start:low] if inside(position)]
+            + order[low:high]
+            + [position for position in order[high:stop] if inside(position)]
+        )
+
+    def price_count(
+        self, products: Sequence[ProductView], price_from: int, price_to: int
+    ) -> int:
+        """Number of positions ``price_slice`` would return."""
+
+        order = self.orders["price-asc"]
+        start, low, high, stop = self._price_span(price_from, price_to)
+        edges = order[start:low] + order[high:stop]
+        return (high - low) + sum(
+            1
+            for position in edges
+            if price_from <= products[position].numeric_price <= price_to
+        )
+
+
+class CatalogIndex:
+    """Catalog orderings and category buckets for one catalog version."""
+
+    def __init__(self, products: Sequence[ProductView]) -> None:
+        self.products: List[ProductView] = list(products)
+        everything = list(range(len(self.products)))
+
+        # ``rank[sort][position]`` is the product's place in that sort order.
+        # Sorting is stable over ``id`` order, like ``apply_catalog_filters``.
+        self._ranks: Dict[str, List[int]] = {}
+        for sort, key in SORT_KEYS.items():
+            keys = [key(product) for product in self.products]
+            order = sorted(everything, key=keys.__getitem__)
+            rank = [0] * len(order)
+            for place, position in enumerate(order):
+                rank[position] = place
+            self._ranks[sort] = rank
+
+        buckets: Dict[str, List[int]] = {}
+        for position, product in enumerate(self.products):
+            buckets.setdefault(product.category_slug, []).append(position)
+
+        self._all = _Group(everything, self._ranks, self.products)
+        self._buckets: Dict[str, _Group] = {
+            slug: _Group(positions, self._ranks, self.products)
+            for slug, positions in buckets.items()
+        }
+
+        self._bounds = catalog_price_bounds(self.products)
+        self._categories = catalog_categories(self.products)
+
+    def price_bounds(self) -> Dict[str, int]:
+        return self._bounds
+
+    def categories(self) -> List[dict]:
+        return self._categories
+
+    def sort_orders(self) -> Dict[str, List[int]]:
+        """Positions of the whole catalog in each ``SORT_KEYS`` order."""
+
+        return self._all.orders
+
+    def facets(
+        self,
+        *,
+        categories: Sequence[str],
+        sort: str,
+        price_from: Optional[int],
+        price_to: Optional[int],
+    ) -> CatalogFacets:
+        """Return what ``catalog_facets`` would for the same arguments.
+
+        Category counts under a price filter are bisected per bucket; without
+        one the precomputed catalog facet is returned as is.
+        """
+
+        products = self.query(
+            categories=categories,
+            sort=sort,
+            price_from=price_from,
+            price_to=price_to,
+        )
+        if not _price_active(price_from, price_to):
+            return CatalogFacets(products, self._categories, self._bounds)
+        counts = {
+            slug: group.price_count(self.products, price_from, price_to)
+            for slug, group in self._buckets.items()
+        }
+        return CatalogFacets(
+            products, category_facet_counts(self._categories, counts), self._bounds
+        )
+
+    def _groups(self, categories: Iterable[str]) -> List[_Group]:
+        slugs = {
+            slug.strip().lower()
+            for slug in categories
+            if slug and slug.strip().lower() != "all"
+        }
+        if not slugs:
+            return [self._all]
+        return [
+            self._buckets[slug] for slug in sorted(slugs) if slug in self._buckets
+        ]
+
+    def query(
+        self,
+        *,
+        categories: Sequence[str],
+        sort: str,
+        price_from: Optional[int],
+        price_to: Optional[int],
+    ) -> List[ProductView]:
+        """Return what ``apply_catalog_filters`` would for the same arguments."""
+
+        price_active = _price_active(price_from, price_to)
+        order = sort if sort in SORT_KEYS or sort == "price-desc" else "price-asc"
+        rank_sort = "price-asc" if order in _PRICE_SORTS else order
+        rank = self._ranks[rank_sort]
+        groups = self._groups(categories)
+
+        if price_active:
+            slices = [
+                group.price_slice(self.products, price_from, price_to)
+                for group in groups
+            ]
+            if order in _PRICE_SORTS:
+                positions = _merge(slices, rank)
+            else:
+                positions = [position for part in slices for position in part]
+                positions.sort(key=rank.__getitem__)
+        else:
+            positions = _merge([group.orders[rank_sort] for group in groups], rank)
+
+        if order == "price-desc":
+            positions = positions[::-1]
+        products = self.products
+        return [products[position] for position in positions]
+
+
+def _price_active(price_from: Optional[int], price_to: Optional[int]) -> bool:
+    return price_from is not None and price_to is not None and price_to > price_from
+
+
+def _merge(parts: List[List[int]], rank: List[int]) -> List[int]:
+    if not parts:
+        return []
+    if len(parts) == 1:
+        return parts[0]
+    return list(heapq.merge(*parts, key=rank.__getitem__))
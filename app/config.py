@@ -1,7 +1,83 @@
 from __future__ import annotations
 
+import hashlib
 import os
+from pathlib import Path
+
+_APP_DIR = Path(__file__).resolve().parent
 
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "1")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "123")
 SESSION_SECRET_KEY = os.getenv("SESSION_SECRET_KEY", "xaWXw3NcJ9TEjhbrXN2Cmcm43fVLYqcVMNMehcz7EQZvY3ycLdrgzXH")
+
+DB_PROFILE = os.getenv("DB_PROFILE", "wal")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_SIZE)))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_HEALTH_CHECK_INTERVAL", "30"))
+
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+API_STREAM_CHUNK_SIZE = int(os.getenv("API_STREAM_CHUNK_SIZE", "500"))
+
+PAGE_CACHE_SIZE = int(os.getenv("PAGE_CACHE_SIZE", "256"))
+
+# ``Cache-Control`` per public route. ``no-cache`` lets clients keep a copy
+# but revalidate it with ``If-None-Match``/``If-Modified-Since`` each time.
+CACHE_CONTROL = {
+    "home": os.getenv("CACHE_CONTROL_HOME", "public, no-cache"),
+    "catalog": os.getenv("CACHE_CONTROL_CATALOG", "public, no-cache"),
+    "product": os.getenv("CACHE_CONTROL_PRODUCT", "public, no-cache"),
+    "api": os.getenv("CACHE_CONTROL_API", "public, no-cache"),
+}
+# Files whose contents shape responses; uploads are covered by the catalog
+# version instead.
+ETAG_SOURCES = ("templates", "scripts", "static/css", "routers", "*.py")
+
+
+def _source_fingerprint() -> str:
+    """Hash the templates, scripts, styles and modules behind the responses."""
+
+    digest = hashlib.sha256()
+    for pattern in ETAG_SOURCES:
+        matches = _APP_DIR.glob(pattern) if "*" in pattern else [_APP_DIR / pattern]
+        for source in sorted(matches):
+            files = sorted(source.rglob("*")) if source.is_dir() else [source]
+            for path in files:
+                if not path.is_file() or "__pycache__" in path.parts:
+                    continue
+                digest.update(path.relative_to(_APP_DIR).as_posix().encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+# Part of every ETag, so a deploy that changes templates or payloads never
+# matches a validator issued by the previous one.
+ETAG_SALT = os.getenv("ETAG_SALT") or _source_fingerprint()
+
+# ``auto`` switches to the NumPy engine (if installed) for large catalogs;
+# ``python`` or ``numpy`` force one engine.
+CATALOG_ENGINE = os.getenv("CATALOG_ENGINE", "auto")
+CATALOG_NUMPY_THRESHOLD = int(os.getenv("CATALOG_NUMPY_THRESHOLD", "50000"))
+
+# Similar products shown on a product page, and how much shared name words
+# count towards similarity next to category and price (0 disables them).
+SIMILAR_PRODUCTS_LIMIT = int(os.getenv("SIMILAR_PRODUCTS_LIMIT", "12"))
+SIMILAR_NAME_WEIGHT = float(os.getenv("SIMILAR_NAME_WEIGHT", "0.3"))
+
+# Products per home page carousel, on first render and per lazy-loaded batch.
+HOME_CAROUSEL_SIZE = int(os.getenv("HOME_CAROUSEL_SIZE", "12"))
+
+# Product cards per catalog page and per batch appended on scroll.
+CATALOG_PAGE_SIZE = int(os.getenv("CATALOG_PAGE_SIZE", "24"))
+
+# Largest catalog filtered in the browser from ``/api/catalog-index``; larger
+# catalogs keep filtering on the server.
+CATALOG_CLIENT_INDEX_MAX = int(os.getenv("CATALOG_CLIENT_INDEX_MAX", "20000"))
+
+# Full-text search: results per ``/api/search`` page by default, and the best
+# matches the catalog page filters and sorts when it shows a search.
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "20"))
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "1000"))
+# Most suggestions ``/api/suggest`` returns for one keystroke.
+SUGGEST_LIMIT = int(os.getenv("SUGGEST_LIMIT", "8"))
@@ -1,12 +1,75 @@
+import math
+import queue
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Generator, List, Mapping, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import config
+from view_helpers import (
+    DERIVED_FIELDS_VERSION,
+    DERIVED_PRODUCT_FIELDS,
+    UNCATEGORIZED,
+    derive_product_fields,
+)
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 DATABASE_PATH = DATA_DIR / "database.db"
 
+# Connection profiles selected through ``config.DB_PROFILE``. ``journal_mode``
+# is persistent and applied by the writer; the remaining pragmas are set on
+# every connection when it is opened. ``wal`` lets catalog readers keep
+# working while the admin commits, which matters with several uvicorn workers
+# sharing one database file.
+DATABASE_PROFILES: Dict[str, Dict[str, object]] = {
+    "rollback": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "cache_size": -2000,
+        "mmap_size": 0,
+    },
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -16000,
+        "mmap_size": 128 * 1024 * 1024,
+    },
+    "wal-durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 10000,
+        "cache_size": -16000,
+        "mmap_size": 128 * 1024 * 1024,
+    },
+}
+
+_DATABASE_WIDE_PRAGMAS = {"journal_mode"}
+
+
+def _profile(name: str) -> Dict[str, object]:
+    try:
+        return DATABASE_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown database profile: {name!r}") from None
+
+
 def _list_product_columns(connection: sqlite3.Connection) -> List[str]:
     """Return the current column names for the ``products`` table."""
 
@@ -14,8 +77,8 @@ def _list_product_columns(connection: sqlite3.Connection) -> List[str]:
     return [row[1] for row in cursor.fetchall()]
 
 
-def _ensure_schema(connection: sqlite3.Connection) -> None:
-    """Create missing tables or columns required by the application."""
+def _migrate_products_table(connection: sqlite3.Connection) -> None:
+    """Create ``products`` and fold legacy image/category columns into it."""
 
     connection.execute(
         """
@@ -32,8 +95,6 @@ def _ensure_schema(connection: sqlite3.Connection) -> None:
 
     existing_columns = set(_list_product_columns(connection))
 
-    schema_updated = False
-
     if "img_path" not in existing_columns:
         if "image_path" in existing_columns:
             try:
@@ -51,7 +112,6 @@ def _ensure_schema(connection: sqlite3.Connection) -> None:
                 )
         else:
             connection.execute("ALTER TABLE products ADD COLUMN img_path TEXT")
-        schema_updated = True
 
     if "image_url" in existing_columns:
         connection.execute(
@@ -62,13 +122,11 @@ def _ensure_schema(connection: sqlite3.Connection) -> None:
               AND image_url IS NOT NULL AND TRIM(image_url) != ''
             """
         )
-        schema_updated = True
 
     if "category" not in existing_columns:
         connection.execute(
             "ALTER TABLE products ADD COLUMN category TEXT DEFAULT 'general'"
         )
-        schema_updated = True
         connection.execute(
             """
             UPDATE products
@@ -77,50 +135,684 @@ def _ensure_schema(connection: sqlite3.Connection) -> None:
             """
         )
 
-    if schema_updated:
-        connection.commit()
 
+def _add_derived_columns(connection: sqlite3.Connection) -> None:
+    """Add the display columns computed at write time.
+
+    The values are filled in by :func:`refresh_derived_fields`, which
+    :func:`migrate` runs after this step and again whenever
+    ``DERIVED_FIELDS_VERSION`` changes, so this migration never depends on
+    the current derivation code.
+    """
+
+    existing_columns = set(_list_product_columns(connection))
+    for column, column_type in (
+        ("numeric_price", "REAL"),
+        ("price_prefix", "TEXT"),
+        ("price_text", "TEXT"),
+        ("category_slug", "TEXT"),
+        ("category_name", "TEXT"),
+        ("category_key", "TEXT"),
+        ("name_key", "TEXT"),
+        ("description_html", "TEXT"),
+    ):
+        if column not in existing_columns:
+            connection.execute(f"ALTER TABLE products ADD COLUMN {column} {column_type}")
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS derived_fields_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        """
+    )
+    connection.execute(
+        "INSERT OR IGNORE INTO derived_fields_version (id, version) VALUES (1, 0)"
+    )
+
+    # Price-ordered ranges of one category or of the whole catalog, read by
+    # ``fetch_price_neighbours`` for the similar products on product pages.
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_products_slug_price"
+        " ON products (category_slug, numeric_price)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_products_numeric_price"
+        " ON products (numeric_price)"
+    )
+
+
+def _add_keyset_indexes(connection: sqlite3.Connection) -> None:
+    """Index the sort keys used for keyset pagination of the product API.
+
+    ``/api/products`` pages by the raw ``price`` column it returns, not by
+    ``numeric_price``, so it needs an index of its own. Each index ends with
+    ``id``, the tie-breaker of every page position.
+    """
+
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_products_price_id ON products (price, id)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_products_name_key_id"
+        " ON products (name_key, id)"
+    )
+
+
+def _add_catalog_version(connection: sqlite3.Connection) -> None:
+    """Count product writes in a one-row table maintained by triggers.
+
+    Every process sees the same counter, so a write made by any worker (or by
+    a script touching the file directly) invalidates all in-memory caches.
+    """
+
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        """
+    )
+    connection.execute(
+        "INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)"
+    )
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        connection.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS products_version_{event.lower()}
+            AFTER {event} ON products
+            BEGIN
+                UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+            END
+            """
+        )
+
+
+_UNIX_NOW_SQL = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+
+def _add_modification_times(connection: sqlite3.Connection) -> None:
+    """Record when each product and the catalog as a whole last changed.
+
+    ``products.updated_at`` is written by the product statements below;
+    ``catalog_version.updated_at`` is kept by the triggers so deletions are
+    covered too. Both hold Unix seconds for ``Last-Modified`` headers.
+    """
+
+    if "updated_at" not in _list_product_columns(connection):
+        connection.execute("ALTER TABLE products ADD COLUMN updated_at INTEGER")
+    version_columns = [
+        row[1] for row in connection.execute("PRAGMA table_info(catalog_version)")
+    ]
+    if "updated_at" not in version_columns:
+        connection.execute("ALTER TABLE catalog_version ADD COLUMN updated_at INTEGER")
+
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        connection.execute(f"DROP TRIGGER IF EXISTS products_version_{event.lower()}")
+    connection.execute(f"UPDATE products SET updated_at = {_UNIX_NOW_SQL}")
+    connection.execute(
+        f"UPDATE catalog_version SET updated_at = {_UNIX_NOW_SQL} WHERE id = 1"
+    )
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        connection.execute(
+            f"""
+            CREATE TRIGGER products_version_{event.lower()}
+            AFTER {event} ON products
+            BEGIN
+                UPDATE catalog_version
+                SET version = version + 1, updated_at = {_UNIX_NOW_SQL}
+                WHERE id = 1;
+            END
+            """
+        )
+
+
+# ``view_helpers.category_group_key`` in SQL: the home page category group.
+_CATEGORY_GROUP_SQL = f"COALESCE(NULLIF(TRIM(category), ''), '{UNCATEGORIZED}')"
+
+
+def _add_category_group_index(connection: sqlite3.Connection) -> None:
+    """Index home page groups so each one can be read with a short range scan."""
+
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_products_category_group"
+        f" ON products ({_CATEGORY_GROUP_SQL})"
+    )
+
+
+def _search_text_sql(expression: str) -> str:
+    # unicode61 keeps "ё" apart from "е", so the indexed text folds it.
+    return f"replace(replace({expression}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _add_search_index(connection: sqlite3.Connection) -> None:
+    """Index names and descriptions for full-text search (see :mod:`search`).
+
+    ``products_fts`` is a contentless FTS5 table keyed by product ``id``: it
+    holds only the index of the ё-folded text, which the triggers below
+    write on every change to ``products``.
+    """
+
+    connection.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+            name,
+            description,
+            content = '',
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """
+    )
+    insert_new = (
+        "INSERT INTO products_fts (rowid, name, description) VALUES (new.id,"
+        f" {_search_text_sql('new.name')}, {_search_text_sql('new.description')});"
+    )
+    delete_old = (
+        "INSERT INTO products_fts (products_fts, rowid, name, description)"
+        f" VALUES ('delete', old.id, {_search_text_sql('old.name')},"
+        f" {_search_text_sql('old.description')});"
+    )
+    for trigger, event, body in (
+        ("insert", "INSERT", insert_new),
+        ("delete", "DELETE", delete_old),
+        ("update", "UPDATE OF id, name, description", delete_old + insert_new),
+    ):
+        connection.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS products_fts_{trigger}
+            AFTER {event} ON products
+            BEGIN
+                {body}
+            END
+            """
+        )
+    connection.execute(
+        "INSERT INTO products_fts (rowid, name, description) SELECT id,"
+        f" {_search_text_sql('name')}, {_search_text_sql('description')}"
+        " FROM products"
+    )
+
+
+def _add_category_id_index(connection: sqlite3.Connection) -> None:
+    """Index products by category in ``id`` order.
 
-def _image_column(connection: sqlite3.Connection) -> str:
-    """Return the column storing image paths, ensuring it exists."""
+    ``fetch_price_neighbours`` reads the lowest ids of a category with it.
+    """
+
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_products_slug_id"
+        " ON products (category_slug, id)"
+    )
+
+
+# Schema migrations in application order. ``PRAGMA user_version`` stores how
+# many of them have been applied, so each one runs exactly once per database.
+# Append new steps to the end; never reorder or edit released ones.
+MIGRATIONS: Tuple[Callable[[sqlite3.Connection], None], ...] = (
+    _migrate_products_table,
+    _add_derived_columns,
+    _add_keyset_indexes,
+    _add_catalog_version,
+    _add_modification_times,
+    _add_category_group_index,
+    _add_search_index,
+    _add_category_id_index,
+)
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def _schema_version(connection: sqlite3.Connection) -> int:
+    return int(connection.execute("PRAGMA user_version").fetchone()[0])
 
-    columns = set(_list_product_columns(connection))
-    if "img_path" in columns:
-        return "img_path"
-    if "image_path" in columns:
-        return "image_path"
 
-    connection.execute("ALTER TABLE products ADD COLUMN img_path TEXT")
+def _derived_fields_version(connection: sqlite3.Connection) -> int:
+    row = connection.execute(
+        "SELECT version FROM derived_fields_version WHERE id = 1"
+    ).fetchone()
+    return int(row[0])
+
+
+def refresh_derived_fields(connection: sqlite3.Connection) -> int:
+    """Recompute the stored display columns of every product.
+
+    Records ``DERIVED_FIELDS_VERSION`` as the version they were derived
+    with. Does not commit; returns the number of products updated.
+    """
+
+    rows = connection.execute(
+        "SELECT id, name, price, description, category FROM products"
+    ).fetchall()
+    connection.executemany(
+        _UPDATE_DERIVED_SQL,
+        [
+            _derived_values(row["name"], row["price"], row["description"], row["category"])
+            + (row["id"],)
+            for row in rows
+        ],
+    )
+    connection.execute(
+        "UPDATE derived_fields_version SET version = ? WHERE id = 1",
+        (DERIVED_FIELDS_VERSION,),
+    )
+    return len(rows)
+
+
+def _is_current(connection: sqlite3.Connection) -> bool:
+    return (
+        _schema_version(connection) >= SCHEMA_VERSION
+        and _derived_fields_version(connection) >= DERIVED_FIELDS_VERSION
+    )
+
+
+def migrate(connection: sqlite3.Connection) -> int:
+    """Apply pending migrations and return the resulting schema version.
+
+    Stored display columns derived with an older ``DERIVED_FIELDS_VERSION``
+    are recomputed in the same transaction.
+    """
+
+    if _is_current(connection):
+        return _schema_version(connection)
+
+    # BEGIN IMMEDIATE takes the write lock up front so concurrently starting
+    # workers queue up here and re-read the version once they get the lock.
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        current = _schema_version(connection)
+        for version in range(current + 1, SCHEMA_VERSION + 1):
+            MIGRATIONS[version - 1](connection)
+            connection.execute(f"PRAGMA user_version = {version}")
+        if _derived_fields_version(connection) < DERIVED_FIELDS_VERSION:
+            refresh_derived_fields(connection)
+    except BaseException:
+        connection.rollback()
+        raise
     connection.commit()
-    return "img_path"
+    return _schema_version(connection)
+
+
+def _open_connection(
+    path: Path, *, readonly: bool = False, profile: str = "rollback"
+) -> sqlite3.Connection:
+    """Open a connection and apply the per-connection pragmas once."""
+
+    if readonly:
+        connection = sqlite3.connect(
+            f"{path.as_uri()}?mode=ro", uri=True, check_same_thread=False
+        )
+    else:
+        connection = sqlite3.connect(path, check_same_thread=False)
+    connection.row_factory = sqlite3.Row
+    for name, value in _profile(profile).items():
+        if name in _DATABASE_WIDE_PRAGMAS:
+            continue
+        connection.execute(f"PRAGMA {name} = {value}")
+    if readonly:
+        connection.execute("PRAGMA query_only = ON")
+    return connection
+
+
+@dataclass
+class PoolStats:
+    size: int
+    open: int
+    idle: int
+    in_use: int
+    created: int = 0
+    leases: int = 0
+    waits: int = 0
+    timeouts: int = 0
+    discarded: int = 0
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared between requests.
 
+    Connections are opened lazily up to ``size`` and handed out one lease at a
+    time. Idle connections are pinged before reuse when they have not been
+    used for ``health_check_interval`` seconds, and broken ones are replaced.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        size: int,
+        *,
+        readonly: bool = False,
+        profile: str = "rollback",
+        timeout: float = 10.0,
+        health_check_interval: float = 30.0,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.path = path
+        self.size = size
+        self.readonly = readonly
+        self.profile = profile
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle: "queue.LifoQueue[Tuple[sqlite3.Connection, float]]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self._closed = False
+        self._stats = PoolStats(size=size, open=0, idle=0, in_use=0)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _create(self) -> sqlite3.Connection:
+        connection = _open_connection(
+            self.path, readonly=self.readonly, profile=self.profile
+        )
+        with self._lock:
+            self._stats.created += 1
+        return connection
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._open >= self.size:
+                return False
+            self._open += 1
+            return True
+
+    def _free_slot(self) -> None:
+        with self._lock:
+            self._open -= 1
+
+    def _is_healthy(self, connection: sqlite3.Connection, idle_since: float) -> bool:
+        if time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            connection.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _discard(self, connection: sqlite3.Connection) -> None:
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+        self._free_slot()
+        with self._lock:
+            self._stats.discarded += 1
+
+    def acquire(self) -> sqlite3.Connection:
+        """Lease a connection, waiting up to ``timeout`` seconds for one."""
+
+        if self._closed:
+            raise RuntimeError("Connection pool is closed.")
+
+        while True:
+            try:
+                connection, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                if self._reserve_slot():
+                    try:
+                        connection = self._create()
+                    except Exception:
+                        self._free_slot()
+                        raise
+                    break
+                with self._lock:
+                    self._stats.waits += 1
+                try:
+                    connection, idle_since = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._stats.timeouts += 1
+                    raise TimeoutError(
+                        f"No database connection available after {self.timeout} s."
+                    ) from None
 
-def _image_select_clause(connection: sqlite3.Connection) -> str:
-    """Return a SQL fragment that aliases the image column to ``img_path``."""
+            if self._is_healthy(connection, idle_since):
+                break
+            self._discard(connection)
 
-    column = _image_column(connection)
-    if column == "img_path":
-        return "img_path"
-    return f"{column} AS img_path"
+        with self._lock:
+            self._stats.leases += 1
+        return connection
 
+    def release(self, connection: sqlite3.Connection) -> None:
+        """Return a leased connection to the pool."""
+
+        if self._closed:
+            self._discard(connection)
+            return
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except sqlite3.Error:
+            self._discard(connection)
+            return
+        self._idle.put((connection, time.monotonic()))
+
+    @contextmanager
+    def connection(self) -> Generator[sqlite3.Connection, None, None]:
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self) -> None:
+        """Close idle connections; leased ones are closed on release."""
+
+        self._closed = True
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            idle = self._idle.qsize()
+            return PoolStats(
+                size=self.size,
+                open=self._open,
+                idle=idle,
+                in_use=self._open - idle,
+                created=self._stats.created,
+                leases=self._stats.leases,
+                waits=self._stats.waits,
+                timeouts=self._stats.timeouts,
+                discarded=self._stats.discarded,
+            )
+
+
+@dataclass
+class VersionStats:
+    version: int
+    updated_at: Optional[int]
+    checks: int
+    reads: int
+
+
+class CatalogVersionProbe:
+    """Cheap cross-process change detection for the product catalog.
+
+    ``PRAGMA data_version`` on a dedicated connection changes whenever any
+    other connection, in this process or another, commits to the file. Only
+    then is the trigger-maintained ``catalog_version`` row read again, so the
+    usual per-request check costs one pragma call.
+    """
+
+    def __init__(self, path: Path, *, profile: str = "rollback") -> None:
+        self._connection = _open_connection(path, readonly=True, profile=profile)
+        self._lock = threading.Lock()
+        self._data_version: Optional[int] = None
+        self._version = 0
+        self._updated_at: Optional[int] = None
+        self._checks = 0
+        self._reads = 0
+
+    def state(self) -> Tuple[int, Optional[int]]:
+        """Return the catalog version and its modification time."""
+
+        with self._lock:
+            self._checks += 1
+            data_version = self._connection.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                row = self._connection.execute(
+                    "SELECT version, updated_at FROM catalog_version WHERE id = 1"
+                ).fetchone()
+                self._version = int(row[0]) if row else 0
+                self._updated_at = row[1] if row else None
+                self._data_version = data_version
+                self._reads += 1
+            return self._version, self._updated_at
+
+    def version(self) -> int:
+        return self.state()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def stats(self) -> VersionStats:
+        with self._lock:
+            return VersionStats(
+                version=self._version,
+                updated_at=self._updated_at,
+                checks=self._checks,
+                reads=self._reads,
+            )
+
+
+@dataclass
+class Database:
+    """Read-only connection pool plus one serialized writer connection.
+
+    Catalog pages lease from ``readers``; admin mutations go through
+    ``writer``, a pool of size one, so writes inside a worker queue up
+    instead of contending for the SQLite lock.
+    """
+
+    readers: ConnectionPool
+    writer: ConnectionPool
+    profile: str
+    version_probe: CatalogVersionProbe
+
+    @property
+    def closed(self) -> bool:
+        return self.readers.closed
+
+    def close(self) -> None:
+        self.readers.close()
+        self.writer.close()
+        self.version_probe.close()
+
+
+_database: Optional[Database] = None
+_database_lock = threading.Lock()
+
+
+def open_database(
+    size: Optional[int] = None, profile: Optional[str] = None
+) -> Database:
+    """Open the reader and writer pools and bring the schema up to date."""
+
+    global _database
+    with _database_lock:
+        if _database is not None and not _database.closed:
+            return _database
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        profile_name = profile or config.DB_PROFILE
+        settings = _profile(profile_name)
+        writer = ConnectionPool(
+            DATABASE_PATH,
+            1,
+            profile=profile_name,
+            timeout=config.DB_POOL_TIMEOUT,
+            health_check_interval=config.DB_HEALTH_CHECK_INTERVAL,
+        )
+        # The writer is opened first and stays in its pool: it creates the
+        # file, runs migrations and switches the journal mode, which readers
+        # opened with ``mode=ro`` cannot do themselves.
+        with writer.connection() as connection:
+            connection.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+            migrate(connection)
+        readers = ConnectionPool(
+            DATABASE_PATH,
+            size or config.DB_POOL_SIZE,
+            readonly=True,
+            profile=profile_name,
+            timeout=config.DB_POOL_TIMEOUT,
+            health_check_interval=config.DB_HEALTH_CHECK_INTERVAL,
+        )
+        _database = Database(
+            readers=readers,
+            writer=writer,
+            profile=profile_name,
+            version_probe=CatalogVersionProbe(DATABASE_PATH, profile=profile_name),
+        )
+        return _database
+
+
+def close_database() -> None:
+    global _database
+    with _database_lock:
+        if _database is not None:
+            _database.close()
+            _database = None
+
+
+def get_database() -> Database:
+    """Return the application database, opening it on first use."""
+
+    database = _database
+    if database is None or database.closed:
+        database = open_database()
+    return database
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    database = get_database()
+    return {
+        "readers": asdict(database.readers.stats()),
+        "writer": asdict(database.writer.stats()),
+        "catalog_version": asdict(database.version_probe.stats()),
+    }
 
 
 @contextmanager
 def get_connection() -> Generator[sqlite3.Connection, None, None]:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    connection = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
-    connection.row_factory = sqlite3.Row
-    _ensure_schema(connection)
-    try:
+    """Lease a read-only connection."""
+
+    with get_database().readers.connection() as connection:
         yield connection
-    finally:
-        connection.close()
 
 
-def get_db() -> Generator[sqlite3.Connection, None, None]:
-    with get_connection() as connection:
+@contextmanager
+def get_write_connection() -> Generator[sqlite3.Connection, None, None]:
+    """Lease the writer connection; callers are serialized."""
+
+    with get_database().writer.connection() as connection:
         yield connection
 
+
+def catalog_version() -> int:
+    """Return a counter that changes whenever products are written.
+
+    The counter lives in the database file, so writes from other worker
+    processes are seen as well.
+    """
+
+    return get_database().version_probe.version()
+
+
+def catalog_state() -> Tuple[int, Optional[int]]:
+    """Return :func:`catalog_version` and the Unix time of that change."""
+
+    return get_database().version_probe.state()
+
+
 @dataclass(init=False)
 class ProductData:
     name: str
@@ -154,35 +846,133 @@ ProductInput = Union[ProductData, Mapping[str, Any]]
 
 ##         Функции для взаимодестввия 
 
-def fetch_all_products(db: sqlite3.Connection) -> List[Dict[str, object]]:
-    """Return all products ordered by their identifier."""
+# The statements below are constant strings: ``sqlite3`` keeps prepared
+# statements in a per-connection cache, so with pooled connections each one
+# is compiled once and reused for every request.
+_PRODUCT_COLUMNS = "id, name, price, description, img_path, category"
 
-    image_clause = _image_select_clause(db)
-    cursor = db.execute(
-        f"SELECT id, name, price, description, {image_clause}, category FROM products ORDER BY id"
+# Values derived from the row in ``view_helpers.derive_product_fields``; they
+# are written together with the product so pages never re-parse prices,
+# slugs or descriptions while rendering.
+_DERIVED_COLUMNS = ", ".join(DERIVED_PRODUCT_FIELDS)
+
+_PRODUCT_VIEW_COLUMNS = f"{_PRODUCT_COLUMNS}, {_DERIVED_COLUMNS}, updated_at"
+
+_SELECT_ALL_PRODUCTS_SQL = f"SELECT {_PRODUCT_COLUMNS} FROM products ORDER BY id"
+
+_SELECT_ALL_PRODUCT_VIEWS_SQL = (
+    f"SELECT {_PRODUCT_VIEW_COLUMNS} FROM products ORDER BY id"
+)
+
+_SELECT_PRODUCT_BY_ID_SQL = f"SELECT {_PRODUCT_COLUMNS} FROM products WHERE id = ?"
+
+_SELECT_PRODUCT_VIEW_BY_ID_SQL = (
+    f"SELECT {_PRODUCT_VIEW_COLUMNS} FROM products WHERE id = ?"
+)
+
+_INSERT_PRODUCT_SQL = f"""
+    INSERT INTO products (
+        name, price, description, img_path, category, {_DERIVED_COLUMNS},
+        updated_at
+    )
+    VALUES (
+        ?, ?, ?, ?, ?, {", ".join("?" for _ in DERIVED_PRODUCT_FIELDS)},
+        {_UNIX_NOW_SQL}
     )
+"""
+
+_UPDATE_PRODUCT_SQL = f"""
+    UPDATE products
+    SET name = ?, price = ?, description = ?, img_path = ?, category = ?,
+        {", ".join(f"{column} = ?" for column in DERIVED_PRODUCT_FIELDS)},
+        updated_at = {_UNIX_NOW_SQL}
+    WHERE id = ?
+"""
+
+_UPDATE_DERIVED_SQL = f"""
+    UPDATE products
+    SET {", ".join(f"{column} = ?" for column in DERIVED_PRODUCT_FIELDS)}
+    WHERE id = ?
+"""
+
+_UPSERT_PRODUCT_SQL = f"""
+    INSERT INTO products (
+        name, price, description, img_path, category, {_DERIVED_COLUMNS},
+        updated_at
+    )
+    VALUES (
+        ?, ?, ?, ?, ?, {", ".join("?" for _ in DERIVED_PRODUCT_FIELDS)},
+        {_UNIX_NOW_SQL}
+    )
+    ON CONFLICT (name) DO UPDATE SET
+        price = excluded.price,
+        description = excluded.description,
+        img_path = COALESCE(excluded.img_path, products.img_path),
+        category = excluded.category,
+        {", ".join(f"{column} = excluded.{column}" for column in DERIVED_PRODUCT_FIELDS)},
+        updated_at = excluded.updated_at
+"""
+
+_DELETE_PRODUCT_SQL = "DELETE FROM products WHERE id = ?"
+
+
+def _derived_values(
+    name: str,
+    price: object,
+    description: Optional[str],
+    category: Optional[str],
+) -> Tuple[object, ...]:
+    derived = derive_product_fields(name, price, description, category)
+    return tuple(derived[column] for column in DERIVED_PRODUCT_FIELDS)
+
+
+def fetch_all_products(
+    db: sqlite3.Connection, *, derived: bool = False
+) -> List[Dict[str, object]]:
+    """Return all products ordered by their identifier.
+
+    With ``derived`` the rows also carry the stored display columns used by
+    ``view_helpers.build_product_views``.
+    """
+
+    sql = _SELECT_ALL_PRODUCT_VIEWS_SQL if derived else _SELECT_ALL_PRODUCTS_SQL
+    cursor = db.execute(sql)
     return [dict(row) for row in cursor.fetchall()]
 
 
 def fetch_product_by_id(
-    db: sqlite3.Connection, product_id: int
+    db: sqlite3.Connection, product_id: int, *, derived: bool = False
 ) -> Optional[Dict[str, object]]:
     """Return a product by identifier if it exists."""
 
-    image_clause = _image_select_clause(db)
-    cursor = db.execute(
-        f"""
-        SELECT id, name, price, description, {image_clause}, category
-        FROM products
-        WHERE id = ?
-        """,
-        (product_id,),
-    )
+    sql = _SELECT_PRODUCT_VIEW_BY_ID_SQL if derived else _SELECT_PRODUCT_BY_ID_SQL
+    cursor = db.execute(sql, (product_id,))
     row = cursor.fetchone()
     if row is None:
         return None
     return dict(row)
 
+def iter_products(chunk_size: int = 500) -> Iterator[List[Dict[str, object]]]:
+    """Yield all products in ``id`` order, ``chunk_size`` rows at a time.
+
+    Each chunk is a keyset page read on its own leased connection, which goes
+    back to the pool before the chunk is yielded: a slow consumer holds
+    neither a reader nor a WAL snapshot. Rows written meanwhile may or may
+    not show up, but none is yielded twice.
+    """
+
+    after: Optional[Tuple[object, int]] = None
+    while True:
+        with get_connection() as connection:
+            rows, after = fetch_products_page(
+                connection, limit=chunk_size, after=after
+            )
+        if rows:
+            yield rows
+        if after is None:
+            return
+
+
 def _get_field(data: ProductInput, field: str, default: Any = None) -> Any:
     """Return ``field`` from ``data`` whether it's an object or mapping."""
 
@@ -205,24 +995,26 @@ def _extract_image_value(data: ProductData) -> Optional[str]:
 
 
 
+def _product_values(data: ProductData) -> Tuple[object, ...]:
+    """Return the insert/update parameters for ``data``, derived columns last."""
+
+    name = _get_field(data, "name")
+    price = _get_field(data, "price")
+    description = _get_field(data, "description")
+    category = _get_field(data, "category") or "general"
+    return (
+        name,
+        price,
+        description,
+        _extract_image_value(data),
+        category,
+    ) + _derived_values(name, price, description, category)
+
+
 def create_product(db: sqlite3.Connection, data: ProductData) -> int:
     """Insert a new product and return its identifier."""
 
-    image_column = _image_column(db)
-    image_value = _extract_image_value(data)
-    cursor = db.execute(
-        f"""
-        INSERT INTO products (name, price, description, {image_column}, category)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (
-            _get_field(data, "name"),
-            _get_field(data, "price"),
-            _get_field(data, "description"),
-            image_value,
-            _get_field(data, "category") or "general",
-        ),
-    )
+    cursor = db.execute(_INSERT_PRODUCT_SQL, _product_values(data))
     db.commit()
     return int(cursor.lastrowid)
 
@@ -232,30 +1024,249 @@ def update_product(
 ) -> bool:
     """Update an existing product. Returns True when a row was updated."""
 
-    image_column = _image_column(db)
-    image_value = _extract_image_value(data)
-    cursor = db.execute(
-        f"""
-        UPDATE products
-        SET name = ?, price = ?, description = ?, {image_column} = ?, category = ?
-        WHERE id = ?
-        """,
-        (
-            _get_field(data, "name"),
-            _get_field(data, "price"),
-            _get_field(data, "description"),
-            image_value,
-            _get_field(data, "category") or "general",
-            product_id,
-        ),
-    )
+    cursor = db.execute(_UPDATE_PRODUCT_SQL, _product_values(data) + (product_id,))
     db.commit()
     return cursor.rowcount > 0
 
 
+def upsert_products(db: sqlite3.Connection, items: Sequence[ProductData]) -> int:
+    """Insert or update ``items`` by name in a single transaction.
+
+    Existing products keep their image when the incoming row has none. The
+    whole batch is rolled back if any row fails. Returns the number of rows
+    written.
+    """
+
+    try:
+        db.executemany(_UPSERT_PRODUCT_SQL, [_product_values(item) for item in items])
+    except BaseException:
+        db.rollback()
+        raise
+    db.commit()
+    return len(items)
+
+
 def delete_product(db: sqlite3.Connection, product_id: int) -> bool:
     """Delete a product by identifier. Returns True when a row was removed."""
 
-    cursor = db.execute("DELETE FROM products WHERE id = ?", (product_id,))
+    cursor = db.execute(_DELETE_PRODUCT_SQL, (product_id,))
     db.commit()
-    return cursor.rowcount > 0
\ No newline at end of file
+    return cursor.rowcount > 0
+
+
+##         Запросы каталога
+
+# The first rows of every home page group in one statement. The recursive
+# part walks the distinct group keys through the expression index, one seek
+# per group, and each group contributes at most ``?`` rows in ``id`` order,
+# so the cost follows the rows returned rather than the catalog size.
+_SELECT_CATEGORY_HEADS_SQL = f"""
+    WITH RECURSIVE category_groups(group_key) AS (
+        SELECT MIN({_CATEGORY_GROUP_SQL}) FROM products
+        UNION ALL
+        SELECT (
+            SELECT MIN({_CATEGORY_GROUP_SQL}) FROM products
+            WHERE {_CATEGORY_GROUP_SQL} > category_groups.group_key
+        )
+        FROM category_groups
+        WHERE category_groups.group_key IS NOT NULL
+    )
+    SELECT {_PRODUCT_VIEW_COLUMNS}
+    FROM category_groups
+    JOIN products ON products.id IN (
+        SELECT id FROM products
+        WHERE {_CATEGORY_GROUP_SQL} = category_groups.group_key
+        ORDER BY id
+        LIMIT ?
+    )
+    ORDER BY id
+"""
+
+_SELECT_CATEGORY_GROUP_PAGE_SQL = f"""
+    SELECT {_PRODUCT_VIEW_COLUMNS} FROM products
+    WHERE {_CATEGORY_GROUP_SQL} = ? AND id > ?
+    ORDER BY id
+    LIMIT ?
+"""
+
+
+def fetch_category_heads(
+    db: sqlite3.Connection, per_category: int
+) -> List[Dict[str, object]]:
+    """Return the first ``per_category`` products of every category group.
+
+    Rows carry the derived display columns and come in ``id`` order, like
+    ``fetch_all_products(derived=True)`` restricted to the group heads.
+    """
+
+    cursor = db.execute(_SELECT_CATEGORY_HEADS_SQL, (per_category,))
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def fetch_category_group_page(
+    db: sqlite3.Connection, group_key: str, *, after: int = 0, limit: int
+) -> List[Dict[str, object]]:
+    """Return up to ``limit`` products of one category group after id ``after``."""
+
+    cursor = db.execute(_SELECT_CATEGORY_GROUP_PAGE_SQL, (group_key, after, limit))
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def fetch_price_neighbours(
+    db: sqlite3.Connection,
+    price: Optional[float],
+    slugs: Sequence[Optional[str]],
+    *,
+    window: int,
+    head: int,
+) -> List[Dict[str, object]]:
+    """Return the products nearest to ``price`` in the price order.
+
+    For each entry of ``slugs`` (a category slug, or ``None`` for the whole
+    catalog) this takes up to ``window`` products priced below ``price``, up
+    to ``window + 1`` at or above it and up to ``window`` unpriced ones, which
+    sort after every price, plus the ``head`` lowest ids. An unpriced
+    ``price`` sorts last as well. Each part is one range of
+    ``idx_products_slug_price``, ``idx_products_numeric_price``,
+    ``idx_products_slug_id`` or the primary key, so the cost does not depend
+    on the catalog size. Rows may repeat and carry the derived display
+    columns.
+    """
+
+    key = math.inf if price is None else price
+    parts: List[str] = []
+    params: List[object] = []
+    for slug in slugs:
+        scope = "category_slug = ? AND " if slug is not None else ""
+        scope_params: List[object] = [slug] if slug is not None else []
+        for condition, order, limit in (
+            ("numeric_price < ?", "numeric_price DESC, id DESC", window),
+            ("numeric_price >= ?", "numeric_price, id", window + 1),
+            ("numeric_price IS NULL", "id", window),
+            ("1", "id", head),
+        ):
+            parts.append(
+                f"SELECT * FROM (SELECT {_PRODUCT_VIEW_COLUMNS} FROM products"
+                f" WHERE {scope}{condition} ORDER BY {order} LIMIT ?)"
+            )
+            params.extend(scope_params)
+            if "?" in condition:
+                params.append(key)
+            params.append(limit)
+
+    if not parts:
+        return []
+    cursor = db.execute(" UNION ALL ".join(parts), params)
+    return [dict(row) for row in cursor.fetchall()]
+
+
+# Full-text search (see :mod:`search` for the ``MATCH`` expressions). BM25
+# scores are negative, lower is better; name matches weigh four times as much
+# as description matches and ``id`` breaks ties.
+_SEARCH_RANK_SQL = "bm25(products_fts, 4.0, 1.0)"
+
+_SEARCH_PRODUCT_COLUMNS = ", ".join(
+    f"products.{column}" for column in _PRODUCT_COLUMNS.split(", ")
+)
+
+_SEARCH_PRODUCTS_SQL = f"""
+    WITH matches AS (
+        SELECT rowid AS match_id, {_SEARCH_RANK_SQL} AS score
+        FROM products_fts
+        WHERE products_fts MATCH ?
+        ORDER BY score, rowid
+        LIMIT ? OFFSET ?
+    )
+    SELECT {_SEARCH_PRODUCT_COLUMNS}
+    FROM matches
+    JOIN products ON products.id = matches.match_id
+    ORDER BY matches.score, matches.match_id
+"""
+
+_SEARCH_PRODUCT_IDS_SQL = f"""
+    SELECT rowid FROM products_fts
+    WHERE products_fts MATCH ?
+    ORDER BY {_SEARCH_RANK_SQL}, rowid
+    LIMIT ?
+"""
+
+_COUNT_SEARCH_MATCHES_SQL = (
+    "SELECT COUNT(*) FROM products_fts WHERE products_fts MATCH ?"
+)
+
+
+def search_products(
+    db: sqlite3.Connection, match: str, *, limit: int, offset: int = 0
+) -> Tuple[List[Dict[str, object]], int]:
+    """Return one page of products matching ``match`` and the number of matches.
+
+    Rows carry the public product columns, best match first.
+    """
+
+    cursor = db.execute(_SEARCH_PRODUCTS_SQL, (match, limit, offset))
+    rows = [dict(row) for row in cursor.fetchall()]
+    total = int(db.execute(_COUNT_SEARCH_MATCHES_SQL, (match,)).fetchone()[0])
+    return rows, total
+
+
+def search_product_ids(
+    db: sqlite3.Connection, match: str, *, limit: int
+) -> List[int]:
+    """Return the ids of the best ``limit`` products matching ``match``."""
+
+    cursor = db.execute(_SEARCH_PRODUCT_IDS_SQL, (match, limit))
+    return [int(row[0]) for row in cursor.fetchall()]
+
+
+# Keyset orderings for the product API: the sort column (``None`` for plain
+# ``id`` order) and its direction. ``id`` always breaks ties, which keeps the
+# order total and lets a page resume strictly after the last row it returned.
+PRODUCT_PAGE_SORTS: Dict[str, Tuple[Optional[str], str]] = {
+    "id": (None, "ASC"),
+    "price-asc": ("price", "ASC"),
+    "price-desc": ("price", "DESC"),
+    "name": ("name_key", "ASC"),
+}
+
+
+def fetch_products_page(
+    db: sqlite3.Connection,
+    *,
+    sort: str = "id",
+    limit: int,
+    after: Optional[Tuple[object, int]] = None,
+) -> Tuple[List[Dict[str, object]], Optional[Tuple[object, int]]]:
+    """Return up to ``limit`` products following the ``after`` position.
+
+    ``after`` is the ``(sort key, id)`` of the last row of the previous page.
+    The second item of the result is the position to continue from, or
+    ``None`` when this was the last page.
+    """
+
+    column, direction = PRODUCT_PAGE_SORTS[sort]
+    comparison = ">" if direction == "ASC" else "<"
+    params: List[object] = []
+
+    if column is None:
+        sql = f"SELECT {_PRODUCT_COLUMNS}, id AS sort_key FROM products"
+        if after is not None:
+            sql += f" WHERE id {comparison} ?"
+            params.append(after[1])
+        sql += f" ORDER BY id {direction}"
+    else:
+        sql = f"SELECT {_PRODUCT_COLUMNS}, {column} AS sort_key FROM products"
+        if after is not None:
+            sql += f" WHERE ({column}, id) {comparison} (?, ?)"
+            params.extend(after)
+        sql += f" ORDER BY {column} {direction}, id {direction}"
+    sql += " LIMIT ?"
+    params.append(limit + 1)
+
+    rows = [dict(row) for row in db.execute(sql, params).fetchall()]
+    next_position: Optional[Tuple[object, int]] = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_position = (rows[-1]["sort_key"], int(rows[-1]["id"]))
+    for row in rows:
+        del row["sort_key"]
+    return rows, next_position
@@ -0,0 +1,108 @@
+"""Conditional request helpers: ETag, Last-Modified and Cache-Control.
+
+Validators are built from the catalog version (and modification time), which
+is known before any query runs, so a matching ``If-None-Match`` or
+``If-Modified-Since`` is answered with ``304 Not Modified`` straight away.
+
+``Last-Modified`` is never earlier than the process start, so a deploy that
+changes templates or payloads invalidates it as it does the ETag salt.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from fastapi import Request, Response, status
+
+import config
+
+STARTED_AT = int(time.time())
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: Optional[int] = None
+
+
+def make_etag(*parts: object) -> str:
+    """Return a strong ETag for the given parts.
+
+    Parts are percent-encoded, as ETags may only hold visible ASCII.
+    """
+
+    return '"' + "-".join(
+        quote(str(part), safe="") for part in (config.ETAG_SALT,) + parts
+    ) + '"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so ``W/"x"`` matches ``"x"``.
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, validators.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = _last_modified(validators)
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return last_modified <= since.timestamp()
+
+
+def _last_modified(validators: Validators) -> Optional[int]:
+    """The ``Last-Modified`` time, or ``None`` while it cannot be trusted.
+
+    The header has one-second resolution, so a write later in the current
+    second would carry the same date; such a date is neither sent nor
+    compared until the second is over, and the ETag alone decides.
+    """
+
+    if validators.last_modified is None:
+        return None
+    last_modified = max(validators.last_modified, STARTED_AT)
+    if last_modified >= int(time.time()):
+        return None
+    return last_modified
+
+
+def cache_headers(route: str, validators: Validators) -> Dict[str, str]:
+    headers = {"ETag": validators.etag}
+    last_modified = _last_modified(validators)
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    cache_control = config.CACHE_CONTROL.get(route)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def not_modified(route: str, validators: Validators) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=cache_headers(route, validators),
+    )
+
+
+def apply(response: Response, route: str, validators: Validators) -> Response:
+    response.headers.update(cache_headers(route, validators))
+    return response
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, status
 from fastapi.exception_handlers import http_exception_handler
 from fastapi.exceptions import HTTPException as FastAPIHTTPException
@@ -7,9 +9,29 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from pathlib import Path
 
+import async_db
+import catalog_cache
+import database
+import page_cache
+import suggest
 from routers import admin, pages
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.database = database.open_database()
+    async_db.start()
+    try:
+        yield
+    finally:
+        async_db.shutdown()
+        catalog_cache.clear()
+        page_cache.cache.clear()
+        suggest.clear()
+        database.close_database()
+
+
+app = FastAPI(lifespan=lifespan)
 
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -0,0 +1,105 @@
+"""Size-bounded LRU cache of rendered public pages.
+
+Public pages depend only on the catalog snapshot and their normalized query,
+so the rendered body is stored under a key built from those and served again
+without touching the database or Jinja. All entries belong to one catalog
+version; the first lookup or store with a newer version empties the cache,
+and requests still working from an older snapshot bypass it.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Hashable, Optional
+
+import config
+
+
+@dataclass
+class PageCacheStats:
+    size: int
+    entries: int
+    version: Optional[int]
+    hits: int
+    misses: int
+    evictions: int
+    redirects: int
+    hit_rate: float
+
+
+class PageCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._redirects = 0
+
+    def _sync_version(self, version: int) -> bool:
+        """Move to ``version`` if it is newer; return whether it is current."""
+
+        if self._version is None or version > self._version:
+            self._entries.clear()
+            self._version = version
+        return version == self._version
+
+    def get(self, key: Hashable, version: int) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key) if self._sync_version(version) else None
+            if body is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return body
+
+    def put(self, key: Hashable, version: int, body: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            # A page rendered from an older snapshot must not replace newer
+            # entries.
+            if not self._sync_version(version):
+                return
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def record_redirect(self) -> None:
+        """Count a request sent to its canonical URL instead of being served."""
+
+        with self._lock:
+            self._redirects += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self) -> PageCacheStats:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return PageCacheStats(
+                size=self.max_entries,
+                entries=len(self._entries),
+                version=self._version,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                redirects=self._redirects,
+                hit_rate=self._hits / lookups if lookups else 0.0,
+            )
+
+
+cache = PageCache(config.PAGE_CACHE_SIZE)
+
+
+def stats() -> dict:
+    return asdict(cache.stats())
@@ -1,26 +1,29 @@
 from __future__ import annotations
 
+import csv
+import io
+import json
+import math
 import sqlite3
+import time
 from pathlib import Path
-from typing import Dict, Optional, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from uuid import uuid4
 from urllib.parse import parse_qs
 
 from fastapi import APIRouter, Depends, Request, Response, UploadFile, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 from starlette.datastructures import UploadFile as StarletteUploadFile
 
+import async_db
 import auth
-from database import (
-    ProductData,
-    create_product,
-    delete_product,
-    fetch_all_products,
-    fetch_product_by_id,
-    update_product,
-    get_db,
-)
+import catalog_cache
+import config
+import page_cache
+from database import ProductData, iter_products, pool_stats
+from view_helpers import is_external_url
 
 STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
 STATIC_ROOT = STATIC_DIR.resolve()
@@ -34,6 +37,13 @@ CATEGORY_CHOICES = [
     "Детский",
 ]
 
+EXCHANGE_FIELDS = ("name", "price", "description", "category", "img_path")
+EXCHANGE_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+}
+IMPORT_ERROR_LIMIT = 20
+
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
@@ -58,6 +68,8 @@ def _parse_product_form(
         price_value = float(price)
     except (TypeError, ValueError):
         return None
+    if not math.isfinite(price_value):
+        return None
 
     description_value = description.strip() if description else ""
     if not description_value:
@@ -112,7 +124,7 @@ async def _save_uploaded_image(upload: UploadFileType) -> str:
 
 
 def _image_storage_path(image_reference: str) -> Optional[Path]:
-    if not image_reference:
+    if not image_reference or is_external_url(str(image_reference)):
         return None
 
     relative = Path(str(image_reference).strip().lstrip("/"))
@@ -229,17 +241,234 @@ async def logout() -> RedirectResponse:
 @router.get("/", response_class=HTMLResponse, dependencies=[Depends(auth.require_login)])
 async def dashboard(
     request: Request,
-    db: sqlite3.Connection = Depends(get_db),
 ) -> HTMLResponse:
     """List all products in the database."""
 
-    products = fetch_all_products(db)
+    products = await async_db.fetch_all_products()
     return templates.TemplateResponse(
         "admin/dashboard.html",
         {"request": request, "products": products},
     )
 
 
+@router.get("/stats", dependencies=[Depends(auth.require_login)])
+async def runtime_stats() -> Dict[str, object]:
+    """Expose internal counters useful when tuning the deployment."""
+
+    return {
+        "db": pool_stats(),
+        "catalog_cache": catalog_cache.stats(),
+        "page_cache": page_cache.stats(),
+    }
+
+
+def _import_format(requested: str, filename: str) -> Optional[str]:
+    value = requested.strip().lower()
+    if not value:
+        value = Path(filename).suffix.lower().lstrip(".")
+        if value in {"ndjson", "json"}:
+            value = "jsonl"
+    return value if value in EXCHANGE_MEDIA_TYPES else None
+
+
+def _read_import_rows(text: str, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield ``(line number, raw row)`` pairs from an uploaded file."""
+
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError:
+            yield line_number, None
+
+
+def _parse_import(text: str, fmt: str) -> Tuple[List[ProductData], List[str]]:
+    """Validate every row with the same rules as the product form.
+
+    Static image paths are normalized; ``http(s)`` image URLs are kept as
+    they are, as the export writes them.
+    """
+
+    items: List[ProductData] = []
+    errors: List[str] = []
+    for line_number, row in _read_import_rows(text, fmt):
+        if not isinstance(row, dict):
+            errors.append(f"Строка {line_number}: не удалось разобрать запись.")
+            continue
+
+        values = {
+            field: "" if row.get(field) is None else str(row.get(field))
+            for field in EXCHANGE_FIELDS
+        }
+        image_path = values["img_path"].strip() or str(row.get("image_path") or "").strip()
+        if image_path and not is_external_url(image_path):
+            resolved = _image_storage_path(image_path)
+            if resolved is None:
+                errors.append(f"Строка {line_number}: недопустимый путь изображения.")
+                continue
+            image_path = resolved.relative_to(STATIC_ROOT).as_posix()
+
+        product_data = _parse_product_form(
+            values["name"],
+            values["price"],
+            values["description"],
+            values["category"],
+            image_path or None,
+        )
+        if product_data is None:
+            errors.append(f"Строка {line_number}: некорректные данные продукта.")
+            continue
+        items.append(product_data)
+
+    return items, errors
+
+
+def _export_rows(fmt: str) -> Iterator[bytes]:
+    """Serialize the catalog chunk by chunk in an importable format."""
+
+    if fmt == "csv":
+        yield "\ufeff".encode("utf-8")
+        buffer = io.StringIO()
+        writer = csv.DictWriter(
+            buffer, fieldnames=EXCHANGE_FIELDS, extrasaction="ignore"
+        )
+        writer.writeheader()
+        for rows in iter_products(config.API_STREAM_CHUNK_SIZE):
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+        return
+
+    for rows in iter_products(config.API_STREAM_CHUNK_SIZE):
+        yield "".join(
+            json.dumps(
+                {field: row[field] for field in EXCHANGE_FIELDS},
+                ensure_ascii=False,
+            )
+            + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+@router.get(
+    "/products/import",
+    response_class=HTMLResponse,
+    dependencies=[Depends(auth.require_login)],
+)
+async def import_products_form(request: Request) -> HTMLResponse:
+    """Render the bulk import form."""
+
+    return templates.TemplateResponse(
+        "admin/import.html",
+        {"request": request, "result": None, "errors": [], "error": None},
+    )
+
+
+@router.post(
+    "/products/import",
+    dependencies=[Depends(auth.require_login)],
+)
+async def import_products_action(request: Request) -> Response:
+    """Create or update products from an uploaded CSV or JSONL file.
+
+    The file is validated as a whole first; nothing is written unless every
+    row passes, and the rows are then upserted by name in one transaction.
+    """
+
+    form = await request.form()
+    upload = form.get("file")
+    requested_format = str(form.get("format", ""))
+    context: Dict[str, object] = {
+        "request": request,
+        "result": None,
+        "errors": [],
+        "error": None,
+    }
+
+    if not isinstance(upload, (UploadFile, StarletteUploadFile)) or not upload.filename:
+        context["error"] = "Пожалуйста, выберите файл для импорта."
+        return templates.TemplateResponse(
+            "admin/import.html", context, status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    fmt = _import_format(requested_format, upload.filename)
+    raw = await upload.read()
+    await upload.close()
+    if fmt is None:
+        context["error"] = "Поддерживаются только файлы CSV и JSONL."
+        return templates.TemplateResponse(
+            "admin/import.html", context, status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        context["error"] = "Файл должен быть в кодировке UTF-8."
+        return templates.TemplateResponse(
+            "admin/import.html", context, status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    started = time.perf_counter()
+    # A large upload takes a while to parse; keep it off the event loop.
+    items, errors = await run_in_threadpool(_parse_import, text, fmt)
+    if errors or not items:
+        context["error"] = (
+            f"Импорт отменён: ошибок — {len(errors)}."
+            if errors
+            else "Файл не содержит продуктов."
+        )
+        context["errors"] = errors[:IMPORT_ERROR_LIMIT]
+        return templates.TemplateResponse(
+            "admin/import.html", context, status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        written = await async_db.upsert_products(items)
+    except sqlite3.IntegrityError:
+        context["error"] = "Импорт отменён: база данных отклонила записи."
+        return templates.TemplateResponse(
+            "admin/import.html", context, status_code=status.HTTP_400_BAD_REQUEST
+        )
+    elapsed = time.perf_counter() - started
+    context["result"] = {
+        "rows": written,
+        "seconds": elapsed,
+        "rows_per_second": written / elapsed if elapsed > 0 else float(written),
+    }
+    return templates.TemplateResponse("admin/import.html", context)
+
+
+@router.get(
+    "/products/export",
+    dependencies=[Depends(auth.require_login)],
+)
+async def export_products(format: str = "csv") -> Response:
+    """Stream every product as CSV or JSONL, ready to be imported again."""
+
+    fmt = format.strip().lower()
+    if fmt not in EXCHANGE_MEDIA_TYPES:
+        return Response(
+            "Unsupported format", status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+    return StreamingResponse(
+        _export_rows(fmt),
+        media_type=EXCHANGE_MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="products.{fmt}"'
+        },
+    )
+
+
 @router.get(
     "/products/new",
     response_class=HTMLResponse,
@@ -267,7 +496,6 @@ async def new_product_form(request: Request) -> HTMLResponse:
 )
 async def create_product_action(
     request: Request,
-    db: sqlite3.Connection = Depends(get_db),
 ) -> Response:
     """Persist a new product in the database."""
 
@@ -366,7 +594,7 @@ async def create_product_action(
         )
 
     try:
-        create_product(db, product_data)
+        await async_db.create_product(product_data)
     except sqlite3.IntegrityError:
         categories, selected_category = _prepare_category_choices(category)
         context = {
@@ -404,11 +632,10 @@ async def create_product_action(
 async def edit_product_form(
     product_id: int,
     request: Request,
-    db: sqlite3.Connection = Depends(get_db),
 ) -> HTMLResponse:
     """Render the form for viewing and editing an existing product."""
 
-    product = fetch_product_by_id(db, product_id)
+    product = await async_db.fetch_product_by_id(product_id)
     if product is None:
         return templates.TemplateResponse(
             "admin/not_found.html",
@@ -442,7 +669,6 @@ async def edit_product_form(
 async def update_product_action(
     product_id: int,
     request: Request,
-    db: sqlite3.Connection = Depends(get_db),
 ) -> Response:
     """Update an existing product."""
 
@@ -468,7 +694,7 @@ async def update_product_action(
         else ""
     )
 
-    existing = fetch_product_by_id(db, product_id)
+    existing = await async_db.fetch_product_by_id(product_id)
     if existing is None:
         return templates.TemplateResponse(
             "admin/not_found.html",
@@ -567,7 +793,7 @@ async def update_product_action(
         old_image_to_delete = pending_delete_image
 
     try:
-        updated = update_product(db, product_id, product_data)
+        updated = await async_db.update_product(product_id, product_data)
     except sqlite3.IntegrityError:
         context = {
             "request": request,
@@ -605,11 +831,10 @@ async def update_product_action(
 async def delete_product_form(
     product_id: int,
     request: Request,
-    db: sqlite3.Connection = Depends(get_db),
 ) -> HTMLResponse:
     """Render a confirmation page for product deletion."""
 
-    product = fetch_product_by_id(db, product_id)
+    product = await async_db.fetch_product_by_id(product_id)
     if product is None:
         return templates.TemplateResponse(
             "admin/not_found.html",
@@ -630,11 +855,10 @@ async def delete_product_form(
 async def delete_product_action(
     product_id: int,
     request: Request,
-    db: sqlite3.Connection = Depends(get_db),
 ) -> Response:
     """Remove the product from the database."""
 
-    product = fetch_product_by_id(db, product_id)
+    product = await async_db.fetch_product_by_id(product_id)
     if product is None:
         return templates.TemplateResponse(
             "admin/not_found.html",
@@ -656,7 +880,7 @@ async def delete_product_action(
             or getattr(product, "image", None)
         )
 
-    deleted = delete_product(db, product_id)
+    deleted = await async_db.delete_product(product_id)
     if deleted and image_reference:
         _delete_image_file(image_reference)
     return RedirectResponse(url="/admin", status_code=status.HTTP_303_SEE_OTHER)
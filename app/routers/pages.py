@@ -1,23 +1,41 @@
 from __future__ import annotations
 
-import sqlite3
+import base64
+import binascii
+import json
+import math
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-
-from database import fetch_all_products, fetch_product_by_id, get_db
+from starlette.concurrency import run_in_threadpool
+
+import async_db
+import catalog_cache
+import catalog_client
+import config
+import http_cache
+import page_cache
+import search
+import similarity
+import suggest
+from database import (
+    PRODUCT_PAGE_SORTS,
+    catalog_state,
+    fetch_products_page,
+    iter_products,
+)
 from view_helpers import (
     CATALOG_SORT_OPTIONS,
-    apply_catalog_filters,
+    SEARCH_SORT_OPTIONS,
+    CatalogFacets,
     build_product_views,
-    catalog_categories,
-    catalog_price_bounds,
+    catalog_facets,
     clamp_price,
     ordered_categories,
-    similar_products,
     slider_step,
 )
 
@@ -38,34 +56,128 @@ templates.env.filters["format_number_ru"] = _format_number_ru
 router = APIRouter()
 
 
+def _page_key(request: Request, *parts: Hashable) -> Tuple[Hashable, ...]:
+    # Static URLs in the templates are absolute, so they depend on the host.
+    return (str(request.base_url),) + parts
+
+
+def _cached_page(key: Tuple[Hashable, ...], version: int) -> Optional[HTMLResponse]:
+    body = page_cache.cache.get(key, version)
+    if body is None:
+        return None
+    return HTMLResponse(body)
+
+
+def _validators(
+    version: int, last_modified: Optional[int], *parts: object
+) -> http_cache.Validators:
+    return http_cache.Validators(
+        etag=http_cache.make_etag(version, *parts), last_modified=last_modified
+    )
+
+
+def _current_validators(*parts: object) -> http_cache.Validators:
+    """Validators for the catalog as it is now, before anything is loaded."""
+
+    version, updated_at = catalog_state()
+    return _validators(version, updated_at, *parts)
+
+
+def _render_page(
+    key: Tuple[Hashable, ...], version: int, name: str, context: Dict[str, object]
+) -> HTMLResponse:
+    """Render ``name`` and keep the body for later requests with the same key."""
+
+    response = templates.TemplateResponse(name, context)
+    page_cache.cache.put(key, version, response.body)
+    return response
+
+
 @router.get("/", response_class=HTMLResponse)
 async def home(
     request: Request,
-    db: sqlite3.Connection = Depends(get_db),
 ) -> HTMLResponse:
-    products_raw = fetch_all_products(db)
-    products = build_product_views(products_raw)
-    categories = ordered_categories(products)
+    # Only the first products of each category are read; the carousels load
+    # the rest from ``home_category_fragment`` as they are scrolled.
+    version, updated_at = catalog_state()
+    validators = _validators(version, updated_at, "home")
+    if http_cache.is_not_modified(request, validators):
+        return http_cache.not_modified("home", validators)
+
+    key = _page_key(request, "home")
+    cached = _cached_page(key, version)
+    if cached is not None:
+        return http_cache.apply(cached, "home", validators)
+
+    size = config.HOME_CAROUSEL_SIZE
+    rows = await async_db.fetch_category_heads(size + 1)
     context = {
         "request": request,
         "active_page": "home",
-        "category_groups": categories,
+        "category_groups": ordered_categories(build_product_views(rows), size),
     }
-    return templates.TemplateResponse("home.html", context)
+    response = _render_page(key, version, "home.html", context)
+    return http_cache.apply(response, "home", validators)
 
 
-@router.get("/catalog", response_class=HTMLResponse)
-async def catalog_page(
+@router.get("/fragments/home-category", response_class=HTMLResponse)
+async def home_category_fragment(
     request: Request,
-    category: Optional[List[str]] = Query(None),
-    sort: str = Query("price-asc"),
-    price_from: Optional[int] = Query(None, alias="price_from"),
-    price_to: Optional[int] = Query(None, alias="price_to"),
-    db: sqlite3.Connection = Depends(get_db),
+    category: str = Query(...),
+    after: int = Query(0, ge=0),
 ) -> HTMLResponse:
-    products_raw = fetch_all_products(db)
-    products = build_product_views(products_raw)
-    bounds = catalog_price_bounds(products)
+    """Product cards continuing one home page carousel after id ``after``."""
+
+    version, updated_at = catalog_state()
+    validators = _validators(version, updated_at, "home-category", category, after)
+    if http_cache.is_not_modified(request, validators):
+        return http_cache.not_modified("home", validators)
+
+    key = _page_key(request, "home-category", category, after)
+    cached = _cached_page(key, version)
+    if cached is not None:
+        return http_cache.apply(cached, "home", validators)
+
+    size = config.HOME_CAROUSEL_SIZE
+    rows = await async_db.fetch_category_group_page(
+        category, after=after, limit=size + 1
+    )
+    products = build_product_views(rows)
+    context = {
+        "request": request,
+        "category": category,
+        "products": products[:size],
+        "next_after": products[size - 1].id if len(products) > size else None,
+    }
+    response = _render_page(key, version, "fragments/carousel_items.html", context)
+    return http_cache.apply(response, "home", validators)
+
+
+def _resolve_price_range(
+    bounds: Dict[str, int], price_from: Optional[int], price_to: Optional[int]
+) -> Tuple[int, int]:
+    """Clamp the requested range to ``bounds``, defaulting to the full range."""
+
+    price_min = bounds.get("min", 0)
+    price_max = bounds.get("max", 0)
+    clamped_from = clamp_price(price_from, bounds=bounds)
+    clamped_to = clamp_price(price_to, bounds=bounds)
+
+    if clamped_from is None:
+        clamped_from = price_min
+    if clamped_to is None:
+        clamped_to = price_max
+    if price_max and clamped_from > clamped_to:
+        clamped_from, clamped_to = clamped_to, clamped_from
+    return clamped_from, clamped_to
+
+
+DEFAULT_CATALOG_SORT = "price-asc"
+SEARCH_SORT = "relevance"
+
+
+def _selected_categories(category: Optional[List[str]]) -> List[str]:
+    """Normalize ``category`` values: sorted unique slugs, or ``["all"]``."""
 
     raw_categories: List[str] = []
     source_categories = category or ["all"]
@@ -87,55 +199,319 @@ async def catalog_page(
 
     if not selected_categories:
         selected_categories = ["all"]
+    elif selected_categories != ["all"]:
+        selected_categories.sort()
+    return selected_categories
+
+
+def _default_sort(search_text: str) -> str:
+    return SEARCH_SORT if search_text else DEFAULT_CATALOG_SORT
+
 
-    sort_value = sort.strip().lower() if sort else "price-asc"
-    allowed_sorts = {option["value"] for option in CATALOG_SORT_OPTIONS}
+def _sort_value(sort: Optional[str], search_text: str = "") -> str:
+    """Normalize ``sort``; search results also allow (and default to) relevance."""
+
+    default = _default_sort(search_text)
+    options = SEARCH_SORT_OPTIONS if search_text else CATALOG_SORT_OPTIONS
+    sort_value = sort.strip().lower() if sort else default
+    allowed_sorts = {option["value"] for option in options}
     if sort_value not in allowed_sorts:
-        sort_value = "price-asc"
+        sort_value = default
+    return sort_value
 
-    price_min = bounds.get("min", 0)
-    price_max = bounds.get("max", 0)
-    clamped_from = clamp_price(price_from, bounds=bounds)
-    clamped_to = clamp_price(price_to, bounds=bounds)
 
-    if clamped_from is None:
-        clamped_from = price_min
-    if clamped_to is None:
-        clamped_to = price_max
-    if price_max and clamped_from > clamped_to:
-        clamped_from, clamped_to = clamped_to, clamped_from
+def _canonical_catalog_params(
+    selected_categories: List[str],
+    sort: str,
+    price_from: int,
+    price_to: int,
+    bounds: Dict[str, int],
+    search_text: str = "",
+) -> List[Tuple[str, str]]:
+    """Return the single query string naming this catalog result set.
+
+    Category slugs come sorted and deduplicated as one comma list; an empty
+    search, the default sort and prices equal to the catalog bounds are left
+    out, as are parameters the catalog does not understand (tracking
+    parameters aside, see :func:`_split_tracking`).
+    """
+
+    params: List[Tuple[str, str]] = []
+    if search_text:
+        params.append(("q", search_text))
+    if selected_categories != ["all"]:
+        params.append(("category", ",".join(selected_categories)))
+    if sort != _default_sort(search_text):
+        params.append(("sort", sort))
+    if price_from != bounds.get("min", 0):
+        params.append(("price_from", str(price_from)))
+    if price_to != bounds.get("max", 0):
+        params.append(("price_to", str(price_to)))
+    return params
+
+
+# Campaign attribution parameters (plus any ``utm_*``). They are carried
+# through the canonical redirect untouched but never reach the cache key.
+TRACKING_PARAMS = frozenset({"gclid", "yclid", "fbclid", "msclkid"})
+
+
+def _split_tracking(
+    query: str,
+) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """Split ``query`` into the catalog's own parameters and tracking ones."""
+
+    own: List[Tuple[str, str]] = []
+    tracking: List[Tuple[str, str]] = []
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        if name in TRACKING_PARAMS or name.startswith("utm_"):
+            tracking.append((name, value))
+        else:
+            own.append((name, value))
+    return own, tracking
+
+
+def _with_page(params: List[Tuple[str, str]], page: int) -> List[Tuple[str, str]]:
+    """``params`` for page ``page``; the first page carries no parameter."""
+
+    return params + [("page", str(page))] if page > 1 else params
+
+
+def _url(path: str, params: List[Tuple[str, str]]) -> str:
+    query = urlencode(params, safe=",")
+    return f"{path}?{query}" if query else path
+
+
+def _catalog_page_count(total: int) -> int:
+    return max(1, -(-total // config.CATALOG_PAGE_SIZE))
+
+
+def _catalog_page_items(products: List[object], page: int) -> List[object]:
+    start = (page - 1) * config.CATALOG_PAGE_SIZE
+    return products[start : start + config.CATALOG_PAGE_SIZE]
+
+
+def _catalog_more_url(filters: List[Tuple[str, str]], page: int, pages: int) -> str:
+    """Fragment URL with the cards of ``page + 1``, or ``""`` after the last."""
+
+    if page >= pages:
+        return ""
+    return _url("/fragments/catalog", filters + [("page", str(page + 1))])
+
+
+def _catalog_next_url(filters: List[Tuple[str, str]], page: int, pages: int) -> str:
+    if page >= pages:
+        return ""
+    return _url("/catalog", _with_page(filters, page + 1))
+
+
+async def _catalog_facets(
+    snapshot: catalog_cache.CatalogSnapshot,
+    search_text: str,
+    *,
+    categories: List[str],
+    sort: str,
+    price_from: int,
+    price_to: int,
+) -> CatalogFacets:
+    """Filter the catalog, or the best search matches when ``search_text`` is set.
+
+    Search matches come from the full-text index (at most
+    ``config.SEARCH_MAX_RESULTS``); category counts then cover the matches
+    and the price bounds stay those of the whole catalog.
+    """
+
+    if not search_text:
+        return snapshot.index.facets(
+            categories=categories,
+            sort=sort,
+            price_from=price_from,
+            price_to=price_to,
+        )
+    match = search.match_query(search_text)
+    ids = (
+        await async_db.search_product_ids(match, limit=config.SEARCH_MAX_RESULTS)
+        if match
+        else []
+    )
+    ranked = [
+        snapshot.by_id[product_id] for product_id in ids if product_id in snapshot.by_id
+    ]
+    facets = catalog_facets(
+        ranked,
+        categories=categories,
+        sort=sort,
+        price_from=price_from,
+        price_to=price_to,
+    )
+    products = facets.products
+    if sort == SEARCH_SORT:
+        places = {product.id: place for place, product in enumerate(ranked)}
+        products = sorted(products, key=lambda product: places[product.id])
+    return CatalogFacets(products, facets.categories, snapshot.bounds)
 
-    filtered = apply_catalog_filters(
-        products,
+
+@router.get("/catalog", response_class=HTMLResponse)
+async def catalog_page(
+    request: Request,
+    q: Optional[str] = Query(None),
+    category: Optional[List[str]] = Query(None),
+    sort: Optional[str] = Query(None),
+    price_from: Optional[int] = Query(None, alias="price_from"),
+    price_to: Optional[int] = Query(None, alias="price_to"),
+    page: int = Query(1),
+) -> Response:
+    validators = _current_validators("catalog")
+    if http_cache.is_not_modified(request, validators):
+        return http_cache.not_modified("catalog", validators)
+
+    search_text = search.normalize_query(q)
+    selected_categories = _selected_categories(category)
+    sort_value = _sort_value(sort, search_text)
+
+    snapshot = await catalog_cache.get_snapshot()
+    validators = _validators(snapshot.version, snapshot.updated_at, "catalog")
+    bounds = snapshot.bounds
+    price_from, price_to = _resolve_price_range(bounds, price_from, price_to)
+    filters = _canonical_catalog_params(
+        selected_categories, sort_value, price_from, price_to, bounds, search_text
+    )
+    page = max(1, page)
+    canonical = _with_page(filters, page)
+    own_params, tracking = _split_tracking(request.url.query)
+    if own_params != canonical:
+        page_cache.cache.record_redirect()
+        return RedirectResponse(
+            url=_url(request.url.path, canonical + tracking),
+            status_code=status.HTTP_302_FOUND,
+        )
+
+    key = _page_key(request, "catalog", tuple(canonical))
+    cached = _cached_page(key, snapshot.version)
+    if cached is not None:
+        return http_cache.apply(cached, "catalog", validators)
+
+    facets = await _catalog_facets(
+        snapshot,
+        search_text,
         categories=selected_categories,
         sort=sort_value,
-        price_from=clamped_from,
-        price_to=clamped_to,
+        price_from=price_from,
+        price_to=price_to,
     )
-
-    categories = catalog_categories(products)
-
+    total = len(facets.products)
+    pages = _catalog_page_count(total)
+    if page > pages:
+        page_cache.cache.record_redirect()
+        return RedirectResponse(
+            url=_url(request.url.path, _with_page(filters, pages) + tracking),
+            status_code=status.HTTP_302_FOUND,
+        )
+
+    products = _catalog_page_items(facets.products, page)
+    first = (page - 1) * config.CATALOG_PAGE_SIZE + 1
     context = {
         "request": request,
         "active_page": "catalog",
-        "categories": categories,
-        "products": filtered,
+        "categories": facets.categories,
+        "products": products,
+        "pagination": {
+            "page": page,
+            "pages": pages,
+            "total": total,
+            "first": first,
+            "last": first + len(products) - 1,
+            "prev_url": _url("/catalog", _with_page(filters, page - 1))
+            if page > 1
+            else "",
+            "next_url": _catalog_next_url(filters, page, pages),
+            "more_url": _catalog_more_url(filters, page, pages),
+        },
         "filters": {
+            "q": search_text,
+            "default_sort": _default_sort(search_text),
             "category": ",".join(selected_categories) if selected_categories else "all",
             "category_query": "all"
             if selected_categories == ["all"]
             else ",".join(selected_categories),
             "selected_categories": selected_categories,
             "sort": sort_value,
-            "price_from": clamped_from,
-            "price_to": clamped_to,
-            "price_min": price_min,
-            "price_max": price_max,
+            "price_from": price_from,
+            "price_to": price_to,
+            "price_min": bounds.get("min", 0),
+            "price_max": bounds.get("max", 0),
         },
-        "sort_options": CATALOG_SORT_OPTIONS,
+        "sort_options": SEARCH_SORT_OPTIONS if search_text else CATALOG_SORT_OPTIONS,
         "slider_step": slider_step(bounds),
+        "catalog_version": snapshot.version,
+        # Search results come from the database, which the client index
+        # cannot reproduce.
+        "client_index": not search_text
+        and len(snapshot.products) <= config.CATALOG_CLIENT_INDEX_MAX,
+        "page_size": config.CATALOG_PAGE_SIZE,
+    }
+    response = _render_page(key, snapshot.version, "catalog.html", context)
+    return http_cache.apply(response, "catalog", validators)
+
+
+@router.get("/fragments/catalog", response_class=HTMLResponse)
+async def catalog_fragment(
+    request: Request,
+    q: Optional[str] = Query(None),
+    category: Optional[List[str]] = Query(None),
+    sort: Optional[str] = Query(None),
+    price_from: Optional[int] = Query(None, alias="price_from"),
+    price_to: Optional[int] = Query(None, alias="price_to"),
+    page: int = Query(1, ge=1),
+) -> HTMLResponse:
+    """Product cards of one catalog page, for appending on scroll.
+
+    Takes the same filters as :func:`catalog_page` and normalizes them the
+    same way, without redirecting; pages past the last one are empty.
+    """
+
+    snapshot = await catalog_cache.get_snapshot()
+    search_text = search.normalize_query(q)
+    selected_categories = _selected_categories(category)
+    sort_value = _sort_value(sort, search_text)
+    bounds = snapshot.bounds
+    price_from, price_to = _resolve_price_range(bounds, price_from, price_to)
+    filters = _canonical_catalog_params(
+        selected_categories, sort_value, price_from, price_to, bounds, search_text
+    )
+    validators = _validators(
+        snapshot.version,
+        snapshot.updated_at,
+        "catalog-fragment",
+        urlencode(_with_page(filters, page)),
+    )
+    if http_cache.is_not_modified(request, validators):
+        return http_cache.not_modified("catalog", validators)
+
+    key = _page_key(request, "catalog-fragment", tuple(filters), page)
+    cached = _cached_page(key, snapshot.version)
+    if cached is not None:
+        return http_cache.apply(cached, "catalog", validators)
+
+    facets = await _catalog_facets(
+        snapshot,
+        search_text,
+        categories=selected_categories,
+        sort=sort_value,
+        price_from=price_from,
+        price_to=price_to,
+    )
+    products = facets.products
+    pages = _catalog_page_count(len(products))
+    context = {
+        "request": request,
+        "products": _catalog_page_items(products, page),
+        "more_url": _catalog_more_url(filters, page, pages),
+        "next_url": _catalog_next_url(filters, page, pages),
     }
-    return templates.TemplateResponse("catalog.html", context)
+    response = _render_page(
+        key, snapshot.version, "fragments/catalog_items.html", context
+    )
+    return http_cache.apply(response, "catalog", validators)
 
 
 @router.get("/about", response_class=HTMLResponse)
@@ -156,15 +532,30 @@ async def contacts_page(request: Request) -> HTMLResponse:
 async def product_page(
     request: Request,
     product_id: int,
-    db: sqlite3.Connection = Depends(get_db),
 ) -> HTMLResponse:
-    product_row = fetch_product_by_id(db, product_id)
-    if product_row is None:
+    # Similar items are rendered too, so the page changes with the catalog.
+    version, updated_at = catalog_state()
+    validators = _validators(version, updated_at, "product", product_id)
+    if http_cache.is_not_modified(request, validators):
+        return http_cache.not_modified("product", validators)
+
+    key = _page_key(request, "product", product_id)
+    cached = _cached_page(key, version)
+    if cached is not None:
+        return http_cache.apply(cached, "product", validators)
+
+    # Two indexed reads whatever the catalog size: the product, then the
+    # price windows its similar items are chosen from.
+    row = await async_db.fetch_product_by_id(product_id, derived=True)
+    if row is None:
         raise HTTPException(status_code=404, detail="Product not found")
-
-    all_products = build_product_views(fetch_all_products(db))
-    product_view = build_product_views([product_row])[0]
-    similar = similar_products(product_view, all_products)
+    neighbours = await async_db.fetch_price_neighbours(
+        row["numeric_price"],
+        similarity.neighbour_scopes(str(row["category_slug"])),
+        window=similarity.candidate_window(config.SIMILAR_PRODUCTS_LIMIT),
+        head=similarity.candidate_head(config.SIMILAR_PRODUCTS_LIMIT),
+    )
+    product_view, similar = similarity.similar_among(product_id, [row, *neighbours])
 
     context = {
         "request": request,
@@ -172,23 +563,215 @@ async def product_page(
         "product": product_view,
         "similar_items": similar,
     }
-    return templates.TemplateResponse("product.html", context)
+    response = _render_page(key, version, "product.html", context)
+    return http_cache.apply(response, "product", validators)
+
+
+def _encode_cursor(sort: str, position: Tuple[object, int]) -> str:
+    payload = json.dumps([sort, position[0], position[1]], separators=(",", ":"))
+    encoded = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+    return encoded.rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> Tuple[object, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, key, last_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    # The key and id are bound straight into the keyset query.
+    if (
+        isinstance(key, bool)
+        or not isinstance(key, (str, int, float))
+        or (isinstance(key, float) and not math.isfinite(key))
+        or isinstance(last_id, bool)
+        or not isinstance(last_id, int)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort:
+        raise HTTPException(
+            status_code=400, detail="Cursor was issued for a different sort"
+        )
+    return key, last_id
+
+
+STREAM_MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _stream_products(stream: str) -> Iterator[bytes]:
+    """Serialize the whole catalog chunk by chunk as a JSON array or NDJSON."""
+
+    if stream == "json":
+        yield b"["
+    separator = b""
+    for rows in iter_products(config.API_STREAM_CHUNK_SIZE):
+        encoded = [json.dumps(row, ensure_ascii=False).encode("utf-8") for row in rows]
+        if stream == "json":
+            yield separator + b",".join(encoded)
+            separator = b","
+        else:
+            yield b"\n".join(encoded) + b"\n"
+    if stream == "json":
+        yield b"]"
 
 
 @router.get("/api/products")
 async def list_products(
-    db: sqlite3.Connection = Depends(get_db),
+    request: Request,
+    response: Response,
+    limit: int = Query(config.API_PAGE_SIZE, ge=1, le=config.API_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("id"),
+    stream: Optional[str] = Query(None),
 ):
-    products = fetch_all_products(db)
-    return {"items": products}
+    """Return one page of products; follow ``next_cursor`` for the next one.
+
+    ``stream=json`` or ``stream=ndjson`` instead exports every product in
+    ``id`` order as a streamed JSON array or newline-delimited JSON.
+    """
+
+    validators = _current_validators("api")
+    if http_cache.is_not_modified(request, validators):
+        return http_cache.not_modified("api", validators)
+
+    if stream is not None:
+        if stream not in STREAM_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail="Unsupported stream format")
+        return StreamingResponse(
+            _stream_products(stream),
+            media_type=STREAM_MEDIA_TYPES[stream],
+            headers=http_cache.cache_headers("api", validators),
+        )
+
+    if sort not in PRODUCT_PAGE_SORTS:
+        raise HTTPException(status_code=400, detail="Unsupported sort")
+    after = _decode_cursor(cursor, sort) if cursor else None
+    products, next_position = await async_db.run_read(
+        fetch_products_page, sort=sort, limit=limit, after=after
+    )
+    http_cache.apply(response, "api", validators)
+    return {
+        "items": products,
+        "next_cursor": _encode_cursor(sort, next_position) if next_position else None,
+    }
 
 
-@router.get("/api/products/{product_id}")
-async def get_product(
-    product_id: int,
-    db: sqlite3.Connection = Depends(get_db),
+@router.get("/api/catalog-index")
+async def catalog_index(request: Request) -> Response:
+    """Compact catalog columns for filtering on the client.
+
+    See :func:`catalog_client.client_index`; the body is built once per
+    catalog version and revalidated with the version's ETag.
+    """
+
+    validators = _current_validators("catalog-index")
+    if http_cache.is_not_modified(request, validators):
+        return http_cache.not_modified("api", validators)
+
+    snapshot = await catalog_cache.get_snapshot()
+    validators = _validators(snapshot.version, snapshot.updated_at, "catalog-index")
+    key = ("catalog-index",)
+    body = page_cache.cache.get(key, snapshot.version)
+    if body is None:
+        body = catalog_client.encode_client_index(
+            snapshot.version, snapshot.products, snapshot.index
+        )
+        page_cache.cache.put(key, snapshot.version, body)
+    response = Response(content=body, media_type="application/json")
+    return http_cache.apply(response, "api", validators)
+
+
+@router.get("/api/search")
+async def search_products(
+    request: Request,
+    response: Response,
+    q: str = Query(""),
+    limit: int = Query(config.SEARCH_PAGE_SIZE, ge=1, le=config.API_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
 ):
-    product_row = fetch_product_by_id(db, product_id)
-    if product_row is None:
+    """Products matching ``q`` by name or description, best match first.
+
+    Continue from ``next_offset`` for more; see :mod:`search` for how the
+    query is matched.
+    """
+
+    search_text = search.normalize_query(q)
+    validators = _current_validators("api-search", search_text, limit, offset)
+    if http_cache.is_not_modified(request, validators):
+        return http_cache.not_modified("api", validators)
+
+    match = search.match_query(search_text)
+    if match is None:
+        items: List[Dict[str, object]] = []
+        total = 0
+    else:
+        items, total = await async_db.search_products(
+            match, limit=limit, offset=offset
+        )
+    http_cache.apply(response, "api", validators)
+    next_offset = offset + len(items)
+    return {
+        "query": search_text,
+        "total": total,
+        "items": items,
+        "next_offset": next_offset if next_offset < total else None,
+    }
+
+
+@router.get("/api/suggest")
+async def suggest_products(
+    request: Request,
+    response: Response,
+    q: str = Query(""),
+    limit: int = Query(config.SUGGEST_LIMIT, ge=1, le=config.SUGGEST_LIMIT),
+):
+    """Category and product suggestions for the text typed so far.
+
+    Answered from the in-memory prefix index in :mod:`suggest`, without a
+    database query while the catalog is unchanged.
+    """
+
+    text = q[: search.MAX_QUERY_LENGTH]
+    validators = _current_validators("api-suggest", text, limit)
+    if http_cache.is_not_modified(request, validators):
+        return http_cache.not_modified("api", validators)
+
+    snapshot = await catalog_cache.get_snapshot()
+    index = suggest.current(snapshot)
+    if index is None:
+        index = await run_in_threadpool(suggest.sync, snapshot, config.SUGGEST_LIMIT)
+    items = index.suggest(text, limit)
+    http_cache.apply(response, "api", validators)
+    return {
+        "query": text,
+        "items": [
+            {"text": item.text, "kind": item.kind, "url": item.url}
+            for item in items
+        ],
+    }
+
+
+@router.get("/api/products/{product_id}")
+async def get_product(request: Request, response: Response, product_id: int):
+    validators = _current_validators("api", product_id)
+    if http_cache.is_not_modified(request, validators):
+        return http_cache.not_modified("api", validators)
+
+    snapshot = await catalog_cache.get_snapshot()
+    product = snapshot.rows_by_id.get(product_id)
+    if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    return dict(product_row)
+
+    validators = _validators(
+        snapshot.version,
+        snapshot.updated_at_by_id.get(product_id),
+        "api",
+        product_id,
+    )
+    if http_cache.is_not_modified(request, validators):
+        return http_cache.not_modified("api", validators)
+    http_cache.apply(response, "api", validators)
+    return dict(product)
@@ -30,8 +30,10 @@
     const sortInput = form.elements.namedItem('sort');
     const priceFromInput = form.elements.namedItem('price_from');
     const priceToInput = form.elements.namedItem('price_to');
+    const searchInput = form.elements.namedItem('q');
     const priceMin = Number(form.dataset.priceMin || '0');
     const priceMax = Number(form.dataset.priceMax || '0');
+    const defaultSort = form.dataset.defaultSort || 'price-asc';
     const sortControls = $$('[data-filter-sort]');
 
     const originalParent = form.parentElement;
@@ -47,20 +49,6 @@
     let overlayRestoreTimer = null;
     let overlayTransitionHandler = null;
     let submitAfterClose = false;
-    const overlayReloadParamName = 'tm';
-    let overlayReloadCounter = (() => {
-      try{
-        const params = new URL(window.location.href).searchParams;
-        const currentValue = Number(params.get(overlayReloadParamName));
-        if(Number.isFinite(currentValue) && currentValue >= 0){
-          return currentValue;
-        }
-      }catch(err){
-        // ignore
-      }
-      return 0;
-    })();
-    let overlayReloadInput = null;
 
     function moveFormTo(target){
       if(!target || !form){
@@ -154,36 +142,39 @@
       }
     }
     
-    function getOverlayReloadInput(){
-      if(overlayReloadInput && overlayReloadInput.isConnected){
-        return overlayReloadInput;
-      }
-      const existing = form.querySelector(`input[name="${overlayReloadParamName}"]`);
-      if(existing){
-        overlayReloadInput = existing;
-        return overlayReloadInput;
-      }
-      const input = document.createElement('input');
-      input.type = 'hidden';
-      input.name = overlayReloadParamName;
-      form.appendChild(input);
-      overlayReloadInput = input;
-      return overlayReloadInput;
-    }
-
-    function submitOverlayReloadForm(){
-      const reloadInput = getOverlayReloadInput();
-      overlayReloadCounter += 1;
-      reloadInput.value = String(overlayReloadCounter);
+    function omitDefaultFields(){
+      // Fields left at their defaults are not submitted, so the URL already
+      // is the canonical one and the server does not have to redirect.
+      const defaults = [
+        [searchInput, ''],
+        [categoryInput, 'all'],
+        [sortInput, defaultSort],
+        [priceFromInput, String(priceMin)],
+        [priceToInput, String(priceMax)],
+      ];
+      defaults.forEach(([input, value]) => {
+        if(input){
+          input.disabled = input.value === '' || input.value === value;
+        }
+      });
+    }
+
+    function submitFilters(){
+      if(applyClientFilters()){
+        return;
+      }
+      omitDefaultFields();
       form.submit();
     }
 
+    form.addEventListener('submit', omitDefaultFields);
+
     function handleOverlayClose(forceSubmit = false){
       const shouldSubmit = forceSubmit || submitAfterClose;
       submitAfterClose = false;
       closeOverlay();
       if(shouldSubmit){
-        submitOverlayReloadForm();
+        submitFilters();
       }
     }
 
@@ -356,7 +347,7 @@
         return false;
       }
       submitAfterClose = false;
-      form.submit();
+      submitFilters();
       return true;
     }
 
@@ -563,7 +554,7 @@
       resetButton.addEventListener('click', () => {
         const defaults = {
           category: 'all',
-          sort: 'price-asc',
+          sort: defaultSort,
           priceFrom: priceMin,
           priceTo: hasValidPriceRange ? priceMax : priceMin,
         };
@@ -578,6 +569,330 @@
       });
     }
 
+    let paginationObserver = null;
+
+    function setupPagination(local = null){
+      // ``local`` hands out batches of the client-side result instead of
+      // fetching fragments for them.
+      if(paginationObserver){
+        paginationObserver.disconnect();
+        paginationObserver = null;
+      }
+      const grid = page.querySelector('[data-catalog-grid]');
+      const pagination = page.querySelector('[data-catalog-pagination]');
+      if(!grid || !pagination){
+        return;
+      }
+      const status = pagination.querySelector('[data-catalog-status]');
+      const nextLink = pagination.querySelector('[data-catalog-next]');
+      let source = local ? (local.hasMore() ? 'local' : '') : pagination.getAttribute('data-catalog-more') || '';
+      let loading = false;
+      let observer = null;
+
+      function updateStatus(){
+        if(!status){
+          return;
+        }
+        const first = Number(status.dataset.first || '1');
+        const total = Number(status.dataset.total || '0');
+        const shown = grid.querySelectorAll('.product-tile').length;
+        status.textContent = `Показано ${first}–${first + shown - 1} из ${total}`;
+      }
+
+      function appendLocal(){
+        grid.insertAdjacentHTML('beforeend', local.next());
+        if(!local.hasMore()){
+          source = '';
+          nextLink?.remove();
+        }else if(nextLink){
+          nextLink.href = local.nextUrl();
+        }
+      }
+
+      async function appendFetched(){
+        const response = await fetch(source, { headers: { 'Accept': 'text/html' } });
+        if(!response.ok){
+          throw new Error(`HTTP ${response.status}`);
+        }
+        const fragment = document.createElement('template');
+        fragment.innerHTML = await response.text();
+        const more = fragment.content.querySelector('[data-catalog-more]');
+        source = more ? more.getAttribute('data-catalog-more') || '' : '';
+        if(nextLink){
+          if(more){
+            nextLink.href = more.getAttribute('data-catalog-next-url') || nextLink.href;
+          }else{
+            nextLink.remove();
+          }
+        }
+        more?.remove();
+        grid.append(fragment.content);
+      }
+
+      async function loadMore(){
+        if(!source || loading){
+          return;
+        }
+        loading = true;
+        pagination.classList.add('is-loading');
+        try{
+          if(local){
+            appendLocal();
+          }else{
+            await appendFetched();
+          }
+          updateStatus();
+        }catch(err){
+          // Leave the plain "next page" link to take over.
+          source = '';
+        }finally{
+          loading = false;
+          pagination.classList.remove('is-loading');
+        }
+        if(observer){
+          // Observing again reports the current state, so a pager that is
+          // still in view after the append loads the next batch too.
+          observer.disconnect();
+          if(source){
+            observer.observe(pagination);
+          }
+        }
+      }
+
+      nextLink?.addEventListener('click', (event) => {
+        if(source){
+          event.preventDefault();
+          loadMore();
+        }
+      });
+
+      if(source && 'IntersectionObserver' in window){
+        observer = new IntersectionObserver((entries) => {
+          if(entries.some(entry => entry.isIntersecting)){
+            loadMore();
+          }
+        }, { rootMargin: '400px 0px' });
+        observer.observe(pagination);
+        paginationObserver = observer;
+      }
+    }
+
+    const catalogContent = page.querySelector('[data-catalog-content]');
+    const pageSize = Number(form.dataset.pageSize || '0') || 24;
+    let clientIndex = null;
+
+    function loadClientIndex(){
+      const source = form.dataset.catalogIndex;
+      if(!source || !catalogContent || !window.fetch || !window.history?.pushState){
+        return;
+      }
+      fetch(source, { headers: { 'Accept': 'application/json' } })
+        .then(response => (response.ok ? response.json() : null))
+        .then(data => {
+          // An index for another catalog version would not match the page,
+          // so filter changes keep going to the server until it reloads.
+          if(data && String(data.version) === form.dataset.catalogVersion){
+            clientIndex = data;
+          }
+        })
+        .catch(() => {});
+    }
+
+    function readFilterState(){
+      return {
+        category: getSelectedCategory(),
+        sort: sortInput?.value || 'price-asc',
+        priceFrom: Number(priceFromInput?.value || priceMin),
+        priceTo: Number(priceToInput?.value || priceMax),
+      };
+    }
+
+    function catalogUrl(state, pageNumber = 1){
+      // The same query string the server treats as canonical: defaults are
+      // left out and category slugs stay as one sorted comma list.
+      const params = [];
+      if(state.category !== 'all'){
+        params.push(['category', state.category.split(',').sort().join(',')]);
+      }
+      if(state.sort !== 'price-asc'){
+        params.push(['sort', state.sort]);
+      }
+      if(state.priceFrom !== priceMin){
+        params.push(['price_from', String(state.priceFrom)]);
+      }
+      if(state.priceTo !== priceMax){
+        params.push(['price_to', String(state.priceTo)]);
+      }
+      if(pageNumber > 1){
+        params.push(['page', String(pageNumber)]);
+      }
+      const query = params
+        .map(([key, value]) => `${key}=${encodeURIComponent(value).replace(/%2C/g, ',')}`)
+        .join('&');
+      return query ? `${window.location.pathname}?${query}` : window.location.pathname;
+    }
+
+    function filterClientIndex(state){
+      // Mirrors apply_catalog_filters: walking a presorted order keeps its
+      // ordering, and category counts follow the price filter only.
+      const index = clientIndex;
+      const slugs = state.category === 'all' ? null : new Set(state.category.split(','));
+      const priceActive = state.priceTo > state.priceFrom;
+      const descending = state.sort === 'price-desc';
+      const order = index.orders[descending ? 'price-asc' : state.sort] || index.orders['price-asc'];
+      const counts = {};
+      const matches = [];
+      for(const position of order){
+        const price = index.prices[position];
+        if(priceActive && (price === null || price < state.priceFrom || price > state.priceTo)){
+          continue;
+        }
+        const slug = index.categories[index.category_codes[position]];
+        counts[slug] = (counts[slug] || 0) + 1;
+        if(slugs && !slugs.has(slug)){
+          continue;
+        }
+        matches.push(position);
+      }
+      if(descending){
+        matches.reverse();
+      }
+      return { matches, counts };
+    }
+
+    function escapeHtml(value){
+      return String(value ?? '').replace(/[&<>"']/g, char => ({
+        '&': '&amp;',
+        '<': '&lt;',
+        '>': '&gt;',
+        '"': '&#34;',
+        "'": '&#39;',
+      })[char]);
+    }
+
+    function renderCard(position){
+      // Same markup as the product_card macro in components.html.
+      const index = clientIndex;
+      const id = index.ids[position];
+      const name = escapeHtml(index.names[position]);
+      const image = index.images[position];
+      const prefix = index.price_prefixes[index.price_prefix_codes[position]];
+      const text = escapeHtml(index.price_texts[position]);
+      const media = image
+        ? `<img src="${escapeHtml(image)}" alt="${name}" loading="lazy" />`
+        : '<div class="product-image-placeholder" aria-hidden="true"></div>';
+      const price = prefix
+        ? `<span class="product-price-prefix">${escapeHtml(prefix)}</span><span class="product-price-number">${text}</span>`
+        : text;
+      return `<a class="product-tile" data-testid="product-card-${id}" href="/product/${id}">`
+        + `<div class="product-image-link${image ? ' has-image' : ''}">${media}</div>`
+        + `<div class="product-card-content"><div class="product-name">${name}</div>`
+        + `<div class="product-price">${price}</div></div>`
+        + '<div class="product-card-footer" aria-hidden="true"><span>Подробнее</span>'
+        + '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="1.5" stroke-linecap="round" stroke-linejoin="round"><path d="M8 5.5 15.5 12 8 18.5" /></svg>'
+        + '</div></a>';
+    }
+
+    function updateCategoryCounts(counts){
+      let total = 0;
+      Object.values(counts).forEach(count => {
+        total += count;
+      });
+      $$('[data-filter-category]', form).forEach(control => {
+        const slug = (control.getAttribute('data-filter-category') || '').toLowerCase() || 'all';
+        const count = control.closest('.catalog-category-item')?.querySelector('.catalog-category-count');
+        if(count){
+          count.textContent = `(${slug === 'all' ? total : counts[slug] || 0})`;
+        }
+      });
+    }
+
+    function renderClientResults(state, matches){
+      if(!matches.length){
+        catalogContent.innerHTML = '<div class="status-card">По выбранным условиям ничего не найдено.</div>';
+        setupPagination();
+        return;
+      }
+      let shown = 0;
+      const local = {
+        next(){
+          const batch = matches.slice(shown, shown + pageSize);
+          shown += batch.length;
+          return batch.map(renderCard).join('');
+        },
+        hasMore(){
+          return shown < matches.length;
+        },
+        nextUrl(){
+          return catalogUrl(state, Math.floor(shown / pageSize) + 1);
+        },
+      };
+      let html = `<div class="product-row product-row--catalog" data-catalog-grid>${local.next()}</div>`;
+      if(local.hasMore()){
+        html += '<nav class="catalog-pagination" aria-label="Страницы каталога" data-catalog-pagination>'
+          + `<span class="catalog-pagination-status" data-catalog-status data-first="1" data-total="${matches.length}">Показано 1–${shown} из ${matches.length}</span>`
+          + `<a class="btn-view-all" href="${escapeHtml(local.nextUrl())}" rel="next" data-catalog-next>Показать ещё</a>`
+          + '</nav>';
+      }
+      catalogContent.innerHTML = html;
+      setupPagination(local);
+    }
+
+    function showClientState(state){
+      const { matches, counts } = filterClientIndex(state);
+      updateCategoryCounts(counts);
+      renderClientResults(state, matches);
+    }
+
+    function applyClientFilters(){
+      // A typed search needs the server's full-text index.
+      if(!clientIndex || (searchInput && searchInput.value.trim())){
+        return false;
+      }
+      const state = readFilterState();
+      showClientState(state);
+      const url = catalogUrl(state);
+      if(url !== window.location.pathname + window.location.search){
+        if(!window.history.state?.catalogEntry){
+          // Mark the entry the page loaded with, so going back to it reloads.
+          window.history.replaceState({ ...window.history.state, catalogEntry: true }, '');
+        }
+        window.history.pushState({ catalogEntry: true, catalogFilters: state }, '', url);
+      }
+      return true;
+    }
+
+    window.addEventListener('popstate', (event) => {
+      if(!event.state?.catalogEntry){
+        // Not an entry this script made, e.g. a jump to an in-page anchor.
+        return;
+      }
+      const state = event.state.catalogFilters;
+      if(!state || !clientIndex){
+        // Entries the server rendered (e.g. a later page) are loaded again.
+        window.location.reload();
+        return;
+      }
+      if(categoryInput){
+        categoryInput.value = state.category;
+      }
+      if(sortInput){
+        sortInput.value = state.sort;
+      }
+      if(priceFromInput){
+        priceFromInput.value = String(state.priceFrom);
+      }
+      if(priceToInput){
+        priceToInput.value = String(state.priceTo);
+      }
+      updateCategoryButtons(state.category);
+      updateSortControls(state.sort);
+      setPriceFields(state.priceFrom, state.priceTo);
+      showClientState(state);
+    });
+
+    setupPagination();
+    loadClientIndex();
     ensureFormInSidebar();
   });
 })();
\ No newline at end of file
@@ -248,6 +248,8 @@
       }
       let index = 0;
       let touchMode = mediaQuery.matches;
+      let source = carousel.dataset.carouselSource || '';
+      let loading = false;
 
       function totalItems(){
         return track.querySelectorAll('.product-tile').length;
@@ -324,12 +326,54 @@
         updateButtons(maxIndex, totalItems() > visible);
       }
 
+      async function loadMore(){
+        if(!source || loading){
+          return;
+        }
+        loading = true;
+        try{
+          const response = await fetch(source, { headers: { 'Accept': 'text/html' } });
+          if(!response.ok){
+            throw new Error(`HTTP ${response.status}`);
+          }
+          const fragment = document.createElement('template');
+          fragment.innerHTML = await response.text();
+          const more = fragment.content.querySelector('[data-carousel-more]');
+          source = more ? more.getAttribute('data-carousel-more') : '';
+          more?.remove();
+          track.append(fragment.content);
+          slideTo(index);
+        }catch(err){
+          source = '';
+        }finally{
+          loading = false;
+        }
+      }
+
+      function maybeLoadMore(){
+        if(!source || loading){
+          return;
+        }
+        if(touchMode){
+          const remaining = track.scrollWidth - track.scrollLeft - track.clientWidth;
+          if(remaining < viewport.clientWidth){
+            loadMore();
+          }
+          return;
+        }
+        if(index + computeVisible() >= totalItems() - 1){
+          loadMore();
+        }
+      }
+
       function slideBy(delta){
         slideTo(index + delta);
+        maybeLoadMore();
       }
 
       prev?.addEventListener('click', () => slideBy(-1));
       next?.addEventListener('click', () => slideBy(1));
+      track.addEventListener('scroll', maybeLoadMore, { passive: true });
 
       function handleMediaChange(){
         touchMode = mediaQuery.matches;
@@ -345,6 +389,7 @@
       window.addEventListener('resize', () => slideTo(index));
 
       slideTo(0);
+      maybeLoadMore();
       carousel.__initialized = true;
 
       instances.push({ refresh: () => slideTo(index) });
@@ -354,9 +399,121 @@
     return instances;
   }
 
+  function setupSuggest(){
+    const form = $('[data-suggest]');
+    const input = form ? $('[data-suggest-input]', form) : null;
+    const list = form ? $('[data-suggest-list]', form) : null;
+    if(!input || !list){
+      return;
+    }
+
+    const kinds = { category: 'Категория', product: 'Товар' };
+    let controller = null;
+    let active = -1;
+
+    function links(){
+      return $$('a', list);
+    }
+
+    function close(){
+      list.hidden = true;
+      list.replaceChildren();
+      input.setAttribute('aria-expanded', 'false');
+      active = -1;
+    }
+
+    function render(items){
+      if(!items.length){
+        close();
+        return;
+      }
+      list.replaceChildren(...items.map((item, position) => {
+        const entry = document.createElement('li');
+        const link = document.createElement('a');
+        const kind = document.createElement('span');
+        link.href = item.url;
+        link.id = `header-search-item-${position}`;
+        link.setAttribute('role', 'option');
+        link.append(item.text);
+        kind.className = 'header-search-kind';
+        kind.textContent = kinds[item.kind] || '';
+        link.append(kind);
+        entry.append(link);
+        return entry;
+      }));
+      list.hidden = false;
+      input.setAttribute('aria-expanded', 'true');
+      active = -1;
+    }
+
+    function highlight(position){
+      const items = links();
+      items.forEach((link, index) => link.classList.toggle('is-active', index === position));
+      active = position;
+      if(items[position]){
+        input.setAttribute('aria-activedescendant', items[position].id);
+      }else{
+        input.removeAttribute('aria-activedescendant');
+      }
+    }
+
+    async function update(){
+      if(controller){
+        controller.abort();
+      }
+      const text = input.value;
+      if(!text.trim()){
+        close();
+        return;
+      }
+      controller = new AbortController();
+      try{
+        const response = await fetch(`/api/suggest?q=${encodeURIComponent(text)}`, {
+          signal: controller.signal,
+          headers: { Accept: 'application/json' },
+        });
+        if(!response.ok){
+          close();
+          return;
+        }
+        const data = await response.json();
+        if(data.query === text){
+          render(data.items);
+        }
+      }catch(error){
+        if(error.name !== 'AbortError'){
+          close();
+        }
+      }
+    }
+
+    input.addEventListener('input', update);
+    input.addEventListener('keydown', (event) => {
+      const items = links();
+      if(event.key === 'Escape'){
+        close();
+      }else if(event.key === 'ArrowDown' && items.length){
+        event.preventDefault();
+        highlight((active + 1) % items.length);
+      }else if(event.key === 'ArrowUp' && items.length){
+        event.preventDefault();
+        highlight(active <= 0 ? items.length - 1 : active - 1);
+      }else if(event.key === 'Enter' && items[active]){
+        event.preventDefault();
+        window.location.href = items[active].href;
+      }
+    });
+    document.addEventListener('click', (event) => {
+      if(!form.contains(event.target)){
+        close();
+      }
+    });
+  }
+
   function init(){
     setCurrentYear();
     initMenu();
+    setupSuggest();
     initCallbackForm();
     setupProductOverlay();
     const instances = setupCarousels();
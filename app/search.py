@@ -0,0 +1,89 @@
+"""Full-text product search over the ``products_fts`` FTS5 table.
+
+The table indexes product names and descriptions with the ``unicode61``
+tokenizer, which case-folds Cyrillic. It does not fold "ё" into "е" (the
+breve is part of the letter, not a removable diacritic), so the triggers
+that keep the table in sync with ``products`` index text with "ё" replaced
+by hand (see :func:`database._add_search_index`), and :func:`stem` does
+the same replacement on query words.
+
+FTS5 has no Russian stemmer, so :func:`match_query` strips a common
+inflectional ending from every query word and searches what is left as a
+prefix: "карельский" becomes ``карельск*`` and also finds "карельского" and
+"карельская". All words must match; results are ranked by BM25 with name
+matches weighted above description matches.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import List, Optional
+
+_word_re = re.compile(r"[^\W_]+")
+
+# Noun and adjective endings, longest first so "ого" wins over "о".
+_ENDINGS = sorted(
+    {
+        "ими", "ыми", "его", "ого", "ему", "ому", "иями", "ями", "ами", "ией",
+        "иям", "ием", "ее", "ие", "ые", "ое", "ей", "ий", "ый", "ой", "ем",
+        "им", "ым", "ом", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею", "ям",
+        "ам", "ах", "ях", "ов", "ев", "ье", "ья", "ью", "ия", "ии", "ию",
+        "а", "е", "и", "й", "о", "у", "ы", "ь", "ю", "я",
+    },
+    key=len,
+    reverse=True,
+)
+_MIN_STEM = 3
+
+# Prepositions and conjunctions would have to match too, so they are dropped
+# unless the query has nothing else.
+_STOP_WORDS = frozenset(
+    {"а", "в", "во", "да", "для", "до", "и", "из", "к", "ко", "на", "о", "об",
+     "от", "по", "с", "со", "у"}
+)
+
+MAX_QUERY_TERMS = 8
+MAX_QUERY_LENGTH = 200
+
+
+def stem(word: str) -> str:
+    """Lower-case ``word`` and drop one inflectional ending, if any."""
+
+    word = word.lower().replace("ё", "е")
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            return word[: -len(ending)]
+    return word
+
+
+def query_terms(text: str) -> List[str]:
+    """Distinct stems of the words in ``text``, at most ``MAX_QUERY_TERMS``."""
+
+    words = [word.lower() for word in _word_re.findall(text)]
+    meaningful = [word for word in words if word not in _STOP_WORDS] or words
+    terms: List[str] = []
+    for word in meaningful:
+        term = stem(word)
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_QUERY_TERMS]
+
+
+def match_query(text: str) -> Optional[str]:
+    """FTS5 ``MATCH`` expression for ``text``, or ``None`` without any words.
+
+    Terms are quoted, so user input can never form FTS5 operators.
+    """
+
+    terms = query_terms(text)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def normalize_query(text: Optional[str]) -> str:
+    """Collapse whitespace and cap the length of a user query."""
+
+    if not text:
+        return ""
+    return " ".join(text.split())[:MAX_QUERY_LENGTH]
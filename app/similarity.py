@@ -0,0 +1,234 @@
+"""Bounded "similar products" lists for product pages.
+
+Listing the whole category (or the whole catalog) would make a product page
+grow with the catalog. :class:`SimilarIndex` returns the top
+``config.SIMILAR_PRODUCTS_LIMIT`` products by score instead:
+
+* the tier keeps the old preference: same category, then "Стандартный", then
+  anything else;
+* price proximity is the ratio of the smaller to the larger price;
+* name overlap is the share of common name words, weighted by
+  ``config.SIMILAR_NAME_WEIGHT`` (``0`` turns it off).
+
+Candidates are read from a window around the product's price in price-sorted
+lists per category, plus the lowest ids of each list, and the best are picked
+with a heap; name overlap only reorders products close in price. Ties go to
+the lower id: when the list has to be filled with products whose price says
+nothing (proximity ``0``, e.g. for an unpriced product), those are the lowest
+ids, which the heads of the lists always hold. Product pages
+read just those windows with indexed queries and score them with
+:func:`similar_among`; :class:`SimilarIndex` also serves whole catalogs held
+in memory, computing each product's list once.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import re
+from bisect import bisect_left
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import config
+from view_helpers import ProductView, build_product_views, category_slug
+
+STANDARD_SLUG = category_slug("Стандартный")
+
+_word_re = re.compile(r"[^\W\d_]{3,}")
+
+
+def _price_key(product: ProductView) -> float:
+    value = product.numeric_price
+    return math.inf if value is None else value
+
+
+def price_proximity(first: Optional[float], second: Optional[float]) -> float:
+    """``1.0`` for equal prices, falling towards ``0.0`` as they diverge."""
+
+    if first is None or second is None:
+        return 1.0 if first is None and second is None else 0.0
+    if first <= 0 or second <= 0:
+        return 1.0 if first == second else 0.0
+    return min(first, second) / max(first, second)
+
+
+def candidate_window(limit: int) -> int:
+    """Products considered on each side of a price for a list of ``limit``."""
+
+    return max(4 * limit, 16)
+
+
+def candidate_head(limit: int) -> int:
+    """Lowest-id products considered per category list for ``limit``."""
+
+    return limit + 1
+
+
+def neighbour_scopes(slug: str) -> List[Optional[str]]:
+    """Category slugs whose price windows can hold candidates, ``None`` = all."""
+
+    if slug == STANDARD_SLUG:
+        return [slug, None]
+    return [slug, STANDARD_SLUG, None]
+
+
+def similar_among(
+    product_id: int, rows: Iterable[Mapping[str, object]]
+) -> Tuple[Optional[ProductView], List[ProductView]]:
+    """Build the product and its similar list from candidate rows only.
+
+    ``rows`` must hold the product itself and, for each of
+    :func:`neighbour_scopes`, the :func:`candidate_window` products on each
+    side of its price and the :func:`candidate_head` lowest ids (as
+    :func:`database.fetch_price_neighbours` returns them). The windows then
+    match those over the whole catalog, so the list is the one
+    :class:`SimilarIndex` would give for the full catalog.
+    """
+
+    unique = {int(row["id"]): row for row in rows}
+    products = build_product_views(unique[key] for key in sorted(unique))
+    index = SimilarIndex(products)
+    product = next((item for item in products if item.id == product_id), None)
+    return product, index.similar(product_id)
+
+
+def name_tokens(product: ProductView) -> FrozenSet[str]:
+    return frozenset(_word_re.findall(product.name_key.replace("ё", "е")))
+
+
+class _PriceList:
+    """Positions of one product subset ordered by price."""
+
+    __slots__ = ("positions", "keys", "head")
+
+    def __init__(
+        self, positions: List[int], keys: List[float], head: List[int]
+    ) -> None:
+        self.positions = sorted(positions, key=keys.__getitem__)
+        self.keys = [keys[position] for position in self.positions]
+        self.head = head
+
+    def window(self, key: float, size: int) -> List[int]:
+        middle = bisect_left(self.keys, key)
+        return self.positions[max(0, middle - size) : middle + size]
+
+
+class SimilarIndex:
+    """Per-version neighbour lists for :class:`~view_helpers.ProductView`."""
+
+    def __init__(
+        self,
+        products: Sequence[ProductView],
+        *,
+        limit: Optional[int] = None,
+        name_weight: Optional[float] = None,
+    ) -> None:
+        self.products: List[ProductView] = list(products)
+        self.limit = config.SIMILAR_PRODUCTS_LIMIT if limit is None else limit
+        self.name_weight = (
+            config.SIMILAR_NAME_WEIGHT if name_weight is None else name_weight
+        )
+        self._window = candidate_window(self.limit)
+        self._head = candidate_head(self.limit)
+        # Larger than price proximity plus name overlap can add, so a higher
+        # tier always wins.
+        self._tier_step = 2.0 + self.name_weight
+        self._positions = {
+            product.id: position for position, product in enumerate(self.products)
+        }
+        self._keys = [_price_key(product) for product in self.products]
+
+        by_id = sorted(
+            range(len(self.products)), key=lambda position: self.products[position].id
+        )
+        buckets: Dict[str, List[int]] = {}
+        for position in by_id:
+            buckets.setdefault(self.products[position].category_slug, []).append(
+                position
+            )
+        self._all = self._price_list(by_id)
+        self._buckets = {
+            slug: self._price_list(positions) for slug, positions in buckets.items()
+        }
+        self._tokens: Dict[int, FrozenSet[str]] = {}
+        self._neighbours: Dict[int, List[int]] = {}
+
+    def _price_list(self, positions: List[int]) -> _PriceList:
+        return _PriceList(positions, self._keys, positions[: self._head])
+
+    def _name_tokens(self, position: int) -> FrozenSet[str]:
+        tokens = self._tokens.get(position)
+        if tokens is None:
+            tokens = name_tokens(self.products[position])
+            self._tokens[position] = tokens
+        return tokens
+
+    def _candidates(self, position: int) -> Iterable[int]:
+        product = self.products[position]
+        key = self._keys[position]
+        seen = {position}
+        lists = [self._buckets[product.category_slug]]
+        standard = self._buckets.get(STANDARD_SLUG)
+        if standard is not None and product.category_slug != STANDARD_SLUG:
+            lists.append(standard)
+        lists.append(self._all)
+
+        for price_list in lists:
+            window = price_list.window(key, self._window)
+            for candidate in itertools.chain(window, price_list.head):
+                if candidate not in seen:
+                    seen.add(candidate)
+                    yield candidate
+            # Later tiers always score lower, so stop once the list is full.
+            if len(seen) > self.limit:
+                return
+
+    def score(self, position: int, candidate: int) -> float:
+        product = self.products[position]
+        other = self.products[candidate]
+        if other.category_slug == product.category_slug:
+            tier = 2
+        elif other.category_slug == STANDARD_SLUG:
+            tier = 1
+        else:
+            tier = 0
+
+        score = tier * self._tier_step
+        score += price_proximity(product.numeric_price, other.numeric_price)
+        if self.name_weight:
+            tokens = self._name_tokens(position)
+            other_tokens = self._name_tokens(candidate)
+            if tokens and other_tokens:
+                overlap = len(tokens & other_tokens) / len(tokens | other_tokens)
+                score += self.name_weight * overlap
+        return score
+
+    def _top(self, position: int) -> List[int]:
+        products = self.products
+        scored: List[Tuple[float, int, int]] = [
+            (self.score(position, candidate), -products[candidate].id, candidate)
+            for candidate in self._candidates(position)
+        ]
+        return [candidate for _, _, candidate in heapq.nlargest(self.limit, scored)]
+
+    def similar(self, product_id: int) -> List[ProductView]:
+        """Best ``limit`` products for ``product_id``, highest score first."""
+
+        position = self._positions.get(product_id)
+        if position is None:
+            return []
+        neighbours = self._neighbours.get(position)
+        if neighbours is None:
+            neighbours = self._top(position)
+            self._neighbours[position] = neighbours
+        return [self.products[candidate] for candidate in neighbours]
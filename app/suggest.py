@@ -0,0 +1,263 @@
+"""Search-as-you-type suggestions from an in-memory prefix index.
+
+Suggestions are the catalog categories (their facet labels, i.e. the
+``CATEGORY_PRESETS`` labels and :func:`view_helpers.display_category_name`)
+and the product names. Each one is indexed under its folded text and under
+every later word of it, so "един" finds "Памятник «Единство»". Folding
+lower-cases, turns "ё" into "е" and keeps only the words.
+
+Keys live in one sorted list; the suggestions for a prefix are the keys in
+its :func:`bisect` range. Short ranges are scanned. For a long range (a short
+or common prefix) the best suggestions are computed from its sub-ranges once
+and cached, so a lookup stays well under a millisecond at any catalog size.
+
+Relevance is fixed per suggestion: categories first, by product count, then
+products with shorter names first, then alphabetically.
+
+:func:`sync` keeps one index per process and brings it up to date with each
+new catalog snapshot. Only changed suggestions are re-keyed, and only the
+cached ranges they fall in are dropped; large changes rebuild instead.
+"""
+
+from __future__ import annotations
+
+import copy
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from catalog_cache import CatalogSnapshot
+from view_helpers import ProductView
+
+_word_re = re.compile(r"[^\W_]+")
+
+# Ranges up to this many keys are scanned instead of cached.
+SCAN_LIMIT = 64
+# Above this share of changed suggestions an update rebuilds the index.
+REBUILD_RATIO = 0.1
+MAX_KEY_WORDS = 8
+
+_KEY_END = "\U0010ffff"
+
+
+def fold(text: str) -> str:
+    """Lower-case words of ``text`` with "ё" as "е", separated by spaces."""
+
+    return " ".join(_word_re.findall(text.casefold().replace("ё", "е")))
+
+
+class Suggestion(NamedTuple):
+    text: str
+    kind: str
+    url: str
+    rank: Tuple[object, ...]
+
+
+def _category_suggestion(category: dict) -> Suggestion:
+    count = int(category["count"])
+    label = str(category["label"])
+    return Suggestion(
+        label,
+        "category",
+        f"/catalog?category={category['slug']}",
+        (0, -count, len(label), fold(label)),
+    )
+
+
+def _product_suggestion(product: ProductView) -> Suggestion:
+    return Suggestion(
+        product.name,
+        "product",
+        product.link,
+        (1, 0, len(product.name), product.name_key),
+    )
+
+
+Ident = Tuple[str, object]
+
+
+def snapshot_suggestions(snapshot: CatalogSnapshot) -> Dict[Ident, Suggestion]:
+    """Suggestions for ``snapshot``, keyed by ``(kind, slug or product id)``."""
+
+    suggestions: Dict[Ident, Suggestion] = {
+        ("category", category["slug"]): _category_suggestion(category)
+        for category in snapshot.categories
+        if category["slug"] != "all" and category["count"]
+    }
+    for product in snapshot.products:
+        suggestions[("product", product.id)] = _product_suggestion(product)
+    return suggestions
+
+
+def _keys(text: str) -> List[str]:
+    words = fold(text).split()
+    return [
+        " ".join(words[start:])
+        for start in range(min(len(words), MAX_KEY_WORDS))
+    ]
+
+
+class SuggestIndex:
+    """Sorted prefix keys over a set of :class:`Suggestion` values."""
+
+    def __init__(self, suggestions: Dict[Ident, Suggestion], limit: int) -> None:
+        self.limit = limit
+        self.version: Optional[int] = None
+        self._build(suggestions)
+
+    def _build(self, suggestions: Dict[Ident, Suggestion]) -> None:
+        self._suggestions = dict(suggestions)
+        entries = sorted(
+            (key, ident)
+            for ident, suggestion in self._suggestions.items()
+            for key in _keys(suggestion.text)
+        )
+        self._entries: List[Tuple[str, Ident]] = entries
+        self._key_list: List[str] = [key for key, _ in entries]
+        self._tops: Dict[str, List[Ident]] = {}
+        # Fill the cache for every long range up front.
+        self._top("", 0, len(entries))
+
+    def __len__(self) -> int:
+        return len(self._suggestions)
+
+    def _best(self, idents: Iterable[Ident]) -> List[Ident]:
+        suggestions = self._suggestions
+        ranked = sorted(
+            set(idents), key=lambda ident: (suggestions[ident].rank, ident)
+        )
+        return ranked[: self.limit]
+
+    def _range(self, prefix: str, lo: int, hi: int) -> Tuple[int, int]:
+        keys = self._key_list
+        start = bisect_left(keys, prefix, lo, hi)
+        return start, bisect_left(keys, prefix + _KEY_END, start, hi)
+
+    def _top(self, prefix: str, lo: int, hi: int) -> List[Ident]:
+        entries = self._entries
+        if hi - lo <= SCAN_LIMIT:
+            return self._best(entries[position][1] for position in range(lo, hi))
+        cached = self._tops.get(prefix)
+        if cached is not None:
+            return cached
+
+        candidates: List[Ident] = []
+        position = lo
+        # Keys equal to the prefix sort first; the rest split by next character.
+        while position < hi and len(entries[position][0]) == len(prefix):
+            candidates.append(entries[position][1])
+            position += 1
+        while position < hi:
+            child = entries[position][0][: len(prefix) + 1]
+            _, end = self._range(child, position, hi)
+            candidates.extend(self._top(child, position, end))
+            position = end
+        best = self._best(candidates)
+        self._tops[prefix] = best
+        return best
+
+    def suggest(self, text: str, limit: Optional[int] = None) -> List[Suggestion]:
+        """Best suggestions with a word sequence starting like ``text``."""
+
+        prefix = fold(text)
+        if not prefix:
+            return []
+        if text[-1:].isspace():
+            # "крест " should not complete to "крестик".
+            prefix += " "
+        lo, hi = self._range(prefix, 0, len(self._key_list))
+        idents = self._top(prefix, lo, hi)
+        if limit is not None:
+            idents = idents[:limit]
+        return [self._suggestions[ident] for ident in idents]
+
+    def _forget(self, key: str) -> None:
+        for end in range(len(key) + 1):
+            self._tops.pop(key[:end], None)
+
+    def _remove(self, ident: Ident) -> None:
+        for key in _keys(self._suggestions.pop(ident).text):
+            position = bisect_left(self._entries, (key, ident))
+            del self._entries[position]
+            del self._key_list[position]
+            self._forget(key)
+
+    def _add(self, ident: Ident, suggestion: Suggestion) -> None:
+        self._suggestions[ident] = suggestion
+        for key in _keys(suggestion.text):
+            position = bisect_left(self._entries, (key, ident))
+            self._entries.insert(position, (key, ident))
+            self._key_list.insert(position, key)
+            self._forget(key)
+
+    def updated(self, suggestions: Dict[Ident, Suggestion]) -> "SuggestIndex":
+        """A copy of this index holding ``suggestions``; this one is unchanged.
+
+        Only the differences are applied to the copy, so lookups can go on
+        using this index meanwhile.
+        """
+
+        current = self._suggestions
+        removed = [ident for ident in current if ident not in suggestions]
+        changed = [
+            ident
+            for ident, suggestion in suggestions.items()
+            if current.get(ident) != suggestion
+        ]
+        if len(removed) + len(changed) > REBUILD_RATIO * len(current):
+            return SuggestIndex(suggestions, self.limit)
+
+        index = copy.copy(self)
+        index._suggestions = dict(current)
+        index._entries = list(self._entries)
+        index._key_list = list(self._key_list)
+        index._tops = dict(self._tops)
+        for ident in removed:
+            index._remove(ident)
+        for ident in changed:
+            if ident in index._suggestions:
+                index._remove(ident)
+            index._add(ident, suggestions[ident])
+        return index
+
+
+_index: Optional[SuggestIndex] = None
+_lock = threading.Lock()
+
+
+def current(snapshot: CatalogSnapshot) -> Optional[SuggestIndex]:
+    """The process-wide index if it matches ``snapshot``, else ``None``."""
+
+    index = _index
+    if index is not None and index.version == snapshot.version:
+        return index
+    return None
+
+
+def sync(snapshot: CatalogSnapshot, limit: int) -> SuggestIndex:
+    """Bring the process-wide index up to ``snapshot`` and return it.
+
+    Builds or updates a new index and then swaps it in, so readers of the
+    previous one are never disturbed. This can take a while for a large
+    catalog; call it off the event loop.
+    """
+
+    global _index
+    with _lock:
+        index = _index
+        if index is None or index.limit != limit:
+            index = SuggestIndex(snapshot_suggestions(snapshot), limit)
+        elif index.version != snapshot.version:
+            index = index.updated(snapshot_suggestions(snapshot))
+        index.version = snapshot.version
+        _index = index
+        return index
+
+
+def clear() -> None:
+    """Drop the index, e.g. when the database is closed."""
+
+    global _index
+    with _lock:
+        _index = None
@@ -0,0 +1,108 @@
+"""Shared fixtures: a small catalog with the awkward cases the fast paths
+must get right, as product views and as a throw-away database.
+
+The application modules are imported flat from ``app/``, as ``main`` does.
+Run with ``python -m pytest app/tests``; the NumPy engine tests are skipped
+when NumPy is not installed.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parent.parent
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import database  # noqa: E402
+from database import ProductData  # noqa: E402
+from view_helpers import ProductView, build_product_views  # noqa: E402
+
+CATEGORIES = (
+    "Стандартный",
+    "Семейный",
+    "Эксклюзивный",
+    "Детский",
+    "Кресты",
+    "",
+)
+WORDS = (
+    "Памятник", "Крест", "стела", "Гранит", "карельский", "Ёлочка", "Елочка",
+    "Мрамор", "габбро", "Династия", "Свет", "память", "Вечность",
+)
+
+
+def _price(rng: random.Random) -> object:
+    roll = rng.random()
+    if roll < 0.08:
+        return "по запросу"
+    if roll < 0.16:
+        return f"от {rng.randrange(5, 90) * 1000}"
+    if roll < 0.3:
+        # Shared prices and fractions that truncate to the same rouble.
+        return rng.choice((15000.0, 15000.4, 15000.9, 30000.0, 30001.0))
+    return float(rng.randrange(3_000, 400_000, 100))
+
+
+def catalog_rows(count: int = 400, *, seed: int = 3) -> List[Dict[str, object]]:
+    """Product rows with repeated names, prices and categories in ``id`` order."""
+
+    rng = random.Random(seed)
+    rows: List[Dict[str, object]] = []
+    for product_id in range(1, count + 1):
+        words = rng.sample(WORDS, rng.randint(1, 3))
+        name = " ".join(words)
+        if rng.random() >= 0.2:
+            name = f"{name} {product_id}"
+        rows.append(
+            {
+                "id": product_id,
+                "name": name,
+                "price": _price(rng),
+                "description": f"{words[0]} из камня.\nАртикул {product_id}.",
+                "img_path": f"uploads/item_{product_id}.jpg",
+                "category": rng.choice(CATEGORIES),
+            }
+        )
+    return rows
+
+
+@pytest.fixture(scope="session")
+def products() -> List[ProductView]:
+    return build_product_views(catalog_rows())
+
+
+@pytest.fixture
+def catalog_db(monkeypatch, tmp_path) -> Iterator[database.Database]:
+    """Point :mod:`database` at a fresh file holding ``catalog_rows``.
+
+    Prices are stored as numbers, as the admin form saves them.
+    """
+
+    database.close_database()
+    monkeypatch.setattr(database, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(database, "DATABASE_PATH", tmp_path / "database.db")
+    db = database.open_database()
+    items = []
+    for row in catalog_rows(300, seed=11):
+        price = row["price"]
+        items.append(
+            ProductData(
+                name=str(row["name"]),
+                price=price if isinstance(price, float) else 0.0,
+                description=str(row["description"]),
+                img_path=str(row["img_path"]),
+                category=str(row["category"]) or "general",
+            )
+        )
+    with database.get_write_connection() as connection:
+        database.upsert_products(connection, items)
+    try:
+        yield db
+    finally:
+        database.close_database()
@@ -0,0 +1,151 @@
+"""The catalog engines and single-pass facets against the plain scan."""
+
+from __future__ import annotations
+
+import itertools
+from collections import Counter
+
+import pytest
+
+import catalog_columns
+import config
+from catalog_columns import ColumnarCatalog, build_engine
+from catalog_index import CatalogIndex
+from view_helpers import (
+    CatalogFacets,
+    apply_catalog_filters,
+    catalog_categories,
+    catalog_facets,
+    catalog_price_bounds,
+    category_facet_counts,
+)
+
+requires_numpy = pytest.mark.skipif(
+    not catalog_columns.NUMPY_AVAILABLE, reason="NumPy is not installed"
+)
+
+SORTS = ("price-asc", "price-desc", "category", "name", "unknown")
+PRICE_RANGES = (
+    (None, None),
+    (None, 30000),
+    (15000, 30000),
+    (15001, 30000),
+    (5000, 15000),
+    (0, 10**9),
+    (15000, 15000),
+    (30000, 15000),
+)
+
+
+def _category_filters(products):
+    slugs = sorted({product.category_slug for product in products})
+    return [
+        [],
+        ["all"],
+        [slugs[0]],
+        slugs[1:3],
+        [f" {slugs[1].upper()} ", slugs[1]],
+        ["all", slugs[2]],
+        ["missing"],
+    ]
+
+
+def _queries(products):
+    for categories, sort, (price_from, price_to) in itertools.product(
+        _category_filters(products), SORTS, PRICE_RANGES
+    ):
+        yield {
+            "categories": categories,
+            "sort": sort,
+            "price_from": price_from,
+            "price_to": price_to,
+        }
+
+
+def _ids(items):
+    return [product.id for product in items]
+
+
+def _reference_facets(products, **query):
+    found = apply_catalog_filters(products, **query)
+    facet = catalog_categories(products)
+    price_from, price_to = query["price_from"], query["price_to"]
+    if price_from is not None and price_to is not None and price_to > price_from:
+        priced = apply_catalog_filters(
+            products,
+            categories=[],
+            sort="price-asc",
+            price_from=price_from,
+            price_to=price_to,
+        )
+        counts = Counter(product.category_slug for product in priced)
+        facet = category_facet_counts(facet, counts)
+    return CatalogFacets(found, facet, catalog_price_bounds(products))
+
+
+@pytest.fixture(params=["index", pytest.param("numpy", marks=requires_numpy)])
+def engine(request, products):
+    if request.param == "numpy":
+        return ColumnarCatalog(products)
+    return CatalogIndex(products)
+
+
+def test_query_matches_scan(engine, products):
+    for query in _queries(products):
+        expected = apply_catalog_filters(products, **query)
+        assert _ids(engine.query(**query)) == _ids(expected), query
+
+
+def test_facets_match_scan(engine, products):
+    for query in _queries(products):
+        expected = _reference_facets(products, **query)
+        facets = engine.facets(**query)
+        assert _ids(facets.products) == _ids(expected.products), query
+        assert facets.categories == expected.categories, query
+        assert facets.bounds == expected.bounds
+
+
+def test_single_pass_facets_match_scan(products):
+    for query in _queries(products):
+        expected = _reference_facets(products, **query)
+        facets = catalog_facets(products, **query)
+        assert _ids(facets.products) == _ids(expected.products), query
+        assert facets.categories == expected.categories, query
+        assert facets.bounds == expected.bounds
+
+
+def test_sort_orders_match_scan(engine, products):
+    positions = {product.id: position for position, product in enumerate(products)}
+    for sort, order in engine.sort_orders().items():
+        expected = apply_catalog_filters(
+            products, categories=[], sort=sort, price_from=None, price_to=None
+        )
+        assert order == [positions[product.id] for product in expected], sort
+
+
+def test_engines_handle_empty_catalog():
+    engines = [CatalogIndex([])]
+    if catalog_columns.NUMPY_AVAILABLE:
+        engines.append(ColumnarCatalog([]))
+    for engine in engines:
+        assert engine.query(
+            categories=[], sort="name", price_from=0, price_to=100
+        ) == []
+        assert engine.price_bounds() == catalog_price_bounds([])
+
+
+def test_build_engine_falls_back_without_numpy(monkeypatch, products):
+    monkeypatch.setattr(catalog_columns, "NUMPY_AVAILABLE", False)
+    monkeypatch.setattr(config, "CATALOG_ENGINE", "numpy")
+    assert isinstance(build_engine(products), CatalogIndex)
+
+
+@requires_numpy
+def test_build_engine_picks_numpy_by_size(monkeypatch, products):
+    monkeypatch.setattr(config, "CATALOG_ENGINE", "auto")
+    monkeypatch.setattr(config, "CATALOG_NUMPY_THRESHOLD", len(products) + 1)
+    assert isinstance(build_engine(products), CatalogIndex)
+    monkeypatch.setattr(config, "CATALOG_NUMPY_THRESHOLD", len(products))
+    assert isinstance(build_engine(products), ColumnarCatalog)
+    monkeypatch.setattr(config, "CATALOG_ENGINE", "python")
+    assert isinstance(build_engine(products), CatalogIndex)
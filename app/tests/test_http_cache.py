@@ -0,0 +1,62 @@
+"""Conditional request validators."""
+
+from __future__ import annotations
+
+import time
+from email.utils import formatdate
+
+from starlette.requests import Request
+
+import http_cache
+from http_cache import Validators
+
+
+def _request(**headers: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [
+                (name.replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def _since(timestamp: int) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def test_if_modified_since_matches_an_older_write(monkeypatch):
+    monkeypatch.setattr(http_cache, "STARTED_AT", 0)
+    written = int(time.time()) - 60
+    validators = Validators('"1"', written)
+    headers = http_cache.cache_headers("home", validators)
+    assert headers["Last-Modified"] == _since(written)
+    request = _request(if_modified_since=headers["Last-Modified"])
+    assert http_cache.is_not_modified(request, validators)
+    assert not http_cache.is_not_modified(
+        _request(if_modified_since=_since(written - 1)), validators
+    )
+
+
+def test_write_in_the_current_second_is_left_to_the_etag(monkeypatch):
+    monkeypatch.setattr(http_cache, "STARTED_AT", 0)
+    now = int(time.time()) + 1
+    validators = Validators('"2"', now)
+    assert "Last-Modified" not in http_cache.cache_headers("home", validators)
+    request = _request(if_modified_since=_since(now))
+    assert not http_cache.is_not_modified(request, validators)
+    assert http_cache.is_not_modified(_request(if_none_match='"2"'), validators)
+
+
+def test_last_modified_is_not_before_the_process_start(monkeypatch):
+    started = int(time.time()) - 10
+    monkeypatch.setattr(http_cache, "STARTED_AT", started)
+    validators = Validators('"3"', started - 3600)
+    headers = http_cache.cache_headers("home", validators)
+    assert headers["Last-Modified"] == _since(started)
+    request = _request(if_modified_since=_since(started - 3600))
+    assert not http_cache.is_not_modified(request, validators)
@@ -0,0 +1,34 @@
+"""Version handling of the rendered page cache."""
+
+from __future__ import annotations
+
+from page_cache import PageCache
+
+
+def test_newer_version_replaces_entries():
+    cache = PageCache(8)
+    cache.put("home", 1, b"old")
+    assert cache.get("home", 1) == b"old"
+    assert cache.get("home", 2) is None
+    cache.put("home", 2, b"new")
+    assert cache.get("home", 2) == b"new"
+    assert cache.stats().version == 2
+
+
+def test_stale_version_neither_reads_nor_flushes():
+    cache = PageCache(8)
+    cache.put("home", 3, b"current")
+    assert cache.get("home", 2) is None
+    cache.put("home", 2, b"stale")
+    cache.put("catalog", 2, b"stale")
+    assert cache.get("home", 3) == b"current"
+    assert cache.get("catalog", 3) is None
+    assert cache.stats().entries == 1
+
+
+def test_entries_are_bounded():
+    cache = PageCache(2)
+    for key in ("a", "b", "c"):
+        cache.put(key, 1, key.encode())
+    assert cache.get("a", 1) is None
+    assert cache.stats().evictions == 1
@@ -0,0 +1,121 @@
+"""Keyset pagination and streaming of ``/api/products``, and its cursors."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import database
+import main
+from routers.pages import _decode_cursor, _encode_cursor
+
+SORT_KEYS = {
+    "id": lambda row: (row["id"],),
+    "price-asc": lambda row: (row["price"], row["id"]),
+    "price-desc": lambda row: (-row["price"], -row["id"]),
+    "name": lambda row: (row["name"].lower(), row["id"]),
+}
+
+
+@pytest.mark.parametrize(
+    "sort, position",
+    [
+        ("id", (17, 17)),
+        ("price-asc", (15000.4, 3)),
+        ("price-desc", (0.0, 250)),
+        ("name", ("памятник «ёлочка» 12", 12)),
+    ],
+)
+def test_cursor_round_trip(sort, position):
+    cursor = _encode_cursor(sort, position)
+    assert "=" not in cursor
+    assert _decode_cursor(cursor, sort) == position
+
+
+MALFORMED_CURSORS = [
+    ("", "id"),
+    ("!!!", "id"),
+    ("bm90IGpzb24", "id"),
+    ("WzEsMl0", "id"),
+    # ["price-asc",[1],2], ["id",1,true] and ["name","a","2"]
+    ("WyJwcmljZS1hc2MiLFsxXSwyXQ", "price-asc"),
+    ("WyJpZCIsMSx0cnVlXQ", "id"),
+    ("WyJuYW1lIiwiYSIsIjIiXQ", "name"),
+]
+
+
+@pytest.mark.parametrize("cursor, sort", MALFORMED_CURSORS)
+def test_malformed_cursor_is_rejected(cursor, sort):
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(cursor, sort)
+    assert error.value.status_code == 400
+
+
+def test_cursor_is_bound_to_its_sort():
+    cursor = _encode_cursor("name", ("крест", 4))
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(cursor, "price-asc")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("sort", sorted(database.PRODUCT_PAGE_SORTS))
+def test_pages_cover_the_catalog_once_in_order(catalog_db, sort):
+    with database.get_connection() as connection:
+        everything = database.fetch_all_products(connection)
+        seen = []
+        after = None
+        while True:
+            rows, after = database.fetch_products_page(
+                connection, sort=sort, limit=7, after=after
+            )
+            seen.extend(rows)
+            if after is None:
+                break
+            after = _decode_cursor(_encode_cursor(sort, after), sort)
+
+    assert seen == sorted(everything, key=SORT_KEYS[sort])
+
+
+def test_api_follows_next_cursor(catalog_db):
+    with TestClient(main.app) as client:
+        ids = []
+        params = {"sort": "price-desc", "limit": 50}
+        while True:
+            body = client.get("/api/products", params=params).json()
+            ids.extend(item["id"] for item in body["items"])
+            if body["next_cursor"] is None:
+                break
+            params["cursor"] = body["next_cursor"]
+
+        everything = client.get("/api/products", params={"limit": 1000}).json()
+        assert sorted(ids) == sorted(item["id"] for item in everything["items"])
+
+        cursor = _encode_cursor("id", (1, 1))
+        params = {"sort": "name", "cursor": cursor}
+        assert client.get("/api/products", params=params).status_code == 400
+
+        # An empty cursor asks for the first page.
+        for cursor, sort in MALFORMED_CURSORS[1:]:
+            params = {"sort": sort, "cursor": cursor}
+            assert client.get("/api/products", params=params).status_code == 400
+
+
+def test_export_returns_its_reader_between_chunks(catalog_db):
+    everything = []
+    for rows in database.iter_products(chunk_size=40):
+        assert database.pool_stats()["readers"]["in_use"] == 0
+        everything.extend(rows)
+    with database.get_connection() as connection:
+        assert everything == database.fetch_all_products(connection)
+
+
+def test_streams_hold_every_product(catalog_db):
+    with TestClient(main.app) as client:
+        listed = client.get("/api/products", params={"limit": 1000}).json()["items"]
+        body = client.get("/api/products", params={"stream": "json"}).json()
+        assert body == listed
+        lines = client.get("/api/products", params={"stream": "ndjson"}).text
+        assert [json.loads(line) for line in lines.splitlines()] == listed
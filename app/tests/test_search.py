@@ -0,0 +1,114 @@
+"""FTS5 search against matching the same stems in Python."""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+import database
+import search
+from database import ProductData
+
+QUERIES = (
+    "памятник",
+    "Гранит карельский",
+    "карельского гранита",
+    "ёлочка",
+    "елочка",
+    "КРЕСТ из камня",
+    "династии свет",
+    "артикул 12",
+    "ве",
+)
+
+
+def _words(text: str):
+    # unicode61 with remove_diacritics also folds "й" into "и".
+    folded = text.lower().replace("ё", "е").replace("й", "и")
+    return re.findall(r"[^\W_]+", folded)
+
+
+def _python_matches(rows, text: str):
+    terms = [term.replace("й", "и") for term in search.query_terms(text)]
+    found = set()
+    for row in rows:
+        words = _words(f"{row['name']} {row['description'] or ''}")
+        if all(any(word.startswith(term) for word in words) for term in terms):
+            found.add(row["id"])
+    return found
+
+
+@pytest.mark.parametrize("text", QUERIES)
+def test_fts_matches_python_scan(catalog_db, text):
+    match = search.match_query(text)
+    with database.get_connection() as connection:
+        rows = database.fetch_all_products(connection)
+        ids = database.search_product_ids(connection, match, limit=len(rows))
+        page, total = database.search_products(connection, match, limit=5)
+
+    assert len(ids) == len(set(ids))
+    assert set(ids) == _python_matches(rows, text)
+    assert total == len(ids)
+    assert [row["id"] for row in page] == ids[:5]
+
+
+def test_yo_and_ye_find_the_same_products(catalog_db):
+    with database.get_connection() as connection:
+        with_yo = database.search_product_ids(
+            connection, search.match_query("Ёлочка"), limit=1000
+        )
+        with_ye = database.search_product_ids(
+            connection, search.match_query("елочка"), limit=1000
+        )
+    assert with_yo and with_yo == with_ye
+
+
+def test_index_follows_product_writes(catalog_db):
+    def found(text):
+        with database.get_connection() as connection:
+            return database.search_product_ids(
+                connection, search.match_query(text), limit=1000
+            )
+
+    with database.get_write_connection() as connection:
+        product_id = database.create_product(
+            connection,
+            ProductData(
+                name="Обелиск Зодиак",
+                price=1000.0,
+                description="Чёрный диабаз",
+                img_path=None,
+                category="Стандартный",
+            ),
+        )
+    assert found("зодиак") == [product_id]
+    assert found("черный диабаз") == [product_id]
+
+    with database.get_write_connection() as connection:
+        database.update_product(
+            connection,
+            product_id,
+            ProductData(
+                name="Обелиск Орион",
+                price=1000.0,
+                description="Серый гранит",
+                img_path=None,
+                category="Стандартный",
+            ),
+        )
+    assert found("зодиак") == []
+    assert product_id in found("орион серый")
+
+    with database.get_write_connection() as connection:
+        database.delete_product(connection, product_id)
+    assert found("орион") == []
+
+
+@pytest.mark.parametrize("text", ['"', "NEAR(", "a AND", "*", "-крест", "col:name"])
+def test_operators_in_queries_are_plain_text(catalog_db, text):
+    match = search.match_query(text)
+    if match is None:
+        return
+    with database.get_connection() as connection:
+        database.search_product_ids(connection, match, limit=10)
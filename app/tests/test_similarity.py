@@ -0,0 +1,63 @@
+"""Top-K similar products against scoring the whole catalog."""
+
+from __future__ import annotations
+
+import config
+import database
+import similarity
+from similarity import SimilarIndex
+from view_helpers import build_product_views
+
+
+def _full_scan(index: SimilarIndex, product_id: int):
+    position = next(
+        place for place, item in enumerate(index.products) if item.id == product_id
+    )
+    ranked = sorted(
+        (
+            (-index.score(position, candidate), index.products[candidate].id)
+            for candidate in range(len(index.products))
+            if candidate != position
+        )
+    )
+    return [product_id for _, product_id in ranked[: index.limit]]
+
+
+def _ids(items):
+    return [product.id for product in items]
+
+
+def test_price_windows_hold_the_best_scores(products):
+    # Without name overlap the score is fixed by tier and price, so the
+    # windows around the price must contain the catalog-wide top K.
+    index = SimilarIndex(products, name_weight=0)
+    for product in products:
+        assert _ids(index.similar(product.id)) == _full_scan(index, product.id)
+
+
+def test_similar_is_bounded_and_excludes_the_product(products):
+    index = SimilarIndex(products, limit=5)
+    for product in products:
+        similar = index.similar(product.id)
+        assert len(similar) == 5
+        assert product.id not in _ids(similar)
+    assert index.similar(-1) == []
+
+
+def test_similar_among_price_neighbours_matches_whole_catalog(catalog_db):
+    window = similarity.candidate_window(config.SIMILAR_PRODUCTS_LIMIT)
+    head = similarity.candidate_head(config.SIMILAR_PRODUCTS_LIMIT)
+    with database.get_connection() as connection:
+        rows = database.fetch_all_products(connection, derived=True)
+        index = SimilarIndex(build_product_views(rows))
+        for row in rows:
+            neighbours = database.fetch_price_neighbours(
+                connection,
+                row["numeric_price"],
+                similarity.neighbour_scopes(str(row["category_slug"])),
+                window=window,
+                head=head,
+            )
+            product, similar = similarity.similar_among(row["id"], [row, *neighbours])
+            assert product is not None and product.id == row["id"]
+            assert _ids(similar) == _ids(index.similar(row["id"])), row["id"]
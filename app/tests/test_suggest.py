@@ -0,0 +1,84 @@
+"""The suggestion prefix index against filtering every suggestion."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+import suggest
+from suggest import SuggestIndex, Suggestion
+
+PREFIXES = (
+    "п", "па", "пам", "памятник ", "к", "кар", "е", "ел", "ёл", "ЁЛОЧКА",
+    "гранит к", "с", "свет", "вечность 1", "1", "я", "",
+)
+
+
+def _suggestions(products):
+    return {
+        ("product", product.id): Suggestion(
+            product.name,
+            "product",
+            product.link,
+            (1, 0, len(product.name), product.name_key),
+        )
+        for product in products
+    }
+
+
+def _expected(suggestions, text, limit):
+    prefix = suggest.fold(text)
+    if not prefix:
+        return []
+    if text[-1:].isspace():
+        prefix += " "
+    matches = [
+        (suggestion.rank, ident)
+        for ident, suggestion in suggestions.items()
+        if any(key.startswith(prefix) for key in suggest._keys(suggestion.text))
+    ]
+    return [suggestions[ident] for _, ident in sorted(matches)[:limit]]
+
+
+def test_fold_ignores_case_yo_and_punctuation():
+    assert suggest.fold("  Памятник «Ёлочка»-2 ") == "памятник елочка 2"
+
+
+def test_lookup_matches_scan(products):
+    suggestions = _suggestions(products)
+    index = SuggestIndex(suggestions, 8)
+    for text in PREFIXES:
+        assert index.suggest(text) == _expected(suggestions, text, 8), text
+        assert index.suggest(text, 3) == _expected(suggestions, text, 3), text
+
+
+@pytest.mark.parametrize("changes", [5, 300])
+def test_updated_matches_a_full_rebuild(products, changes):
+    suggestions = _suggestions(products)
+    index = SuggestIndex(suggestions, 8)
+    before = {text: index.suggest(text) for text in PREFIXES}
+
+    rng = random.Random(changes)
+    edited = dict(suggestions)
+    idents = list(edited)
+    for ident in rng.sample(idents, changes):
+        if rng.random() < 0.5:
+            del edited[ident]
+        else:
+            name = f"Ёлочка {rng.choice(['Крест', 'Свет', 'Стела'])} {ident[1]}"
+            edited[ident] = edited[ident]._replace(
+                text=name, rank=(1, 0, len(name), name.lower())
+            )
+    edited[("category", "novye")] = Suggestion(
+        "Новые", "category", "/catalog?category=novye", (0, -3, 5, "новые")
+    )
+
+    updated = index.updated(edited)
+    rebuilt = SuggestIndex(edited, 8)
+    assert len(updated) == len(rebuilt)
+    for text in PREFIXES + ("нов", "елочка к"):
+        assert updated.suggest(text) == rebuilt.suggest(text), text
+        assert updated.suggest(text) == _expected(edited, text, 8), text
+    # The index readers may still hold is left untouched.
+    assert {text: index.suggest(text) for text in PREFIXES} == before
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable, List, Optional, Sequence
+from functools import lru_cache
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Sequence
 
 import math
 import re
@@ -53,11 +53,19 @@ CATEGORY_PRESET_INDEX = {
 
 PRICE_REQUEST_TEXT = "по запросу"
 
+UNCATEGORIZED = "Без категории"
+
 
 _slug_invalid_re = re.compile(r"[^\w\d]+", re.IGNORECASE)
 _http_re = re.compile(r"^https?://", re.IGNORECASE)
 
 
+def is_external_url(value: str) -> bool:
+    """Whether ``value`` is an absolute ``http(s)`` URL rather than a static path."""
+
+    return bool(_http_re.match(value.strip()))
+
+
 def resolve_image_path(value: Optional[str]) -> str:
     """Return a web accessible path for ``value``."""
 
@@ -68,7 +76,7 @@ def resolve_image_path(value: Optional[str]) -> str:
     if not raw:
         return ""
 
-    if _http_re.match(raw):
+    if is_external_url(raw):
         return raw
 
     if raw.startswith("/"):
@@ -84,7 +92,7 @@ def resolve_image_path(value: Optional[str]) -> str:
 def display_category_name(value: Optional[str]) -> str:
     raw = (value or "").strip()
     if not raw:
-        return "Без категории"
+        return UNCATEGORIZED
     return CATEGORY_TITLES.get(raw, raw)
 
 
@@ -101,11 +109,10 @@ def _category_preset_by_name(name: Optional[str]) -> Optional[dict[str, Sequence
 def _category_preset_by_slug(slug: Optional[str]) -> Optional[dict[str, Sequence[str]]]:
     if not slug:
         return None
-    normalized = slug.strip().lower()
-    for preset in CATEGORY_PRESETS:
-        if preset["slug"] == normalized:
-            return preset
-    return None
+    index = CATEGORY_PRESET_INDEX.get(slug.strip().lower())
+    if index is None:
+        return None
+    return CATEGORY_PRESETS[index]
 
 
 def category_slug(value: Optional[str]) -> str:
@@ -173,68 +180,154 @@ def format_description(value: Optional[str]) -> str:
     return value.replace("\r\n", "\n").replace("\n", "<br>")
 
 
-@dataclass
-class ProductView:
+def derive_product_fields(
+    name: str,
+    price: Optional[object],
+    description: Optional[str],
+    category: Optional[str],
+) -> dict[str, object]:
+    """Compute the display values stored next to a product when it is saved."""
+
+    display = price_display(price)
+    category_name = display_category_name(category)
+    return {
+        "numeric_price": parse_numeric_price(price),
+        "price_prefix": display["prefix"],
+        "price_text": display["text"],
+        "category_slug": category_slug(category),
+        "category_name": category_name,
+        "category_key": category_name.lower(),
+        "name_key": (name or "").lower(),
+        "description_html": format_description(description),
+    }
+
+
+# Bump whenever ``derive_product_fields`` computes anything differently:
+# ``database.migrate`` re-derives the stored values of databases written with
+# an older version.
+DERIVED_FIELDS_VERSION = 1
+
+DERIVED_PRODUCT_FIELDS: Sequence[str] = (
+    "numeric_price",
+    "price_prefix",
+    "price_text",
+    "category_slug",
+    "category_name",
+    "category_key",
+    "name_key",
+    "description_html",
+)
+
+
+class PriceDisplay(NamedTuple):
+    prefix: str
+    text: str
+
+
+class ProductView(NamedTuple):
+    """Immutable product as rendered by the public pages.
+
+    A named tuple, so instances carry no ``__dict__`` (``__slots__`` is
+    empty) and cannot be modified once shared from the catalog cache. Every
+    value the templates and catalog sorting read is computed once by
+    :func:`build_product_views` instead of on each access.
+    """
+
     id: int
     name: str
     price: Optional[object]
     description: str
     category: Optional[str]
     img_path: Optional[str]
+    numeric_price: Optional[float]
+    price_display: PriceDisplay
+    price_text: str
+    image_url: str
+    category_name: str
+    category_slug: str
+    category_key: str
+    name_key: str
+    description_html: str
 
     @property
-    def numeric_price(self) -> Optional[float]:
-        return parse_numeric_price(self.price)
-
-    @property
-    def price_display(self) -> dict[str, str]:
-        return price_display(self.price)
+    def link(self) -> str:
+        return f"/product/{self.id}"
 
-    @property
-    def price_text(self) -> str:
-        parts = self.price_display
-        if parts["prefix"]:
-            return f"{parts['prefix']} {parts['text']}"
-        return parts["text"]
 
-    @property
-    def image_url(self) -> str:
-        return resolve_image_path(self.img_path)
+@lru_cache(maxsize=8192)
+def _price_parts(prefix: str, text: str) -> tuple[PriceDisplay, str]:
+    # Catalogs repeat the same prices a lot; share the display objects.
+    return PriceDisplay(prefix, text), f"{prefix} {text}" if prefix else text
 
-    @property
-    def category_name(self) -> str:
-        return display_category_name(self.category)
 
-    @property
-    def category_slug(self) -> str:
-        return category_slug(self.category)
+def build_product_views(rows: Iterable[Mapping[str, object]]) -> List[ProductView]:
+    """Build views, reusing the derived columns stored with each row if any."""
 
-    @property
-    def link(self) -> str:
-        return f"/product/{self.id}"
+    # Every row read from the database carries its own copy of the few
+    # category strings; keeping one copy of each saves about a quarter of a
+    # large snapshot (35 MB at 100k products).
+    shared: dict[str, str] = {}
 
+    def share(value: str) -> str:
+        return shared.setdefault(value, value)
 
-def build_product_views(rows: Iterable[dict[str, object]]) -> List[ProductView]:
     products: List[ProductView] = []
     for row in rows:
+        name = str(row.get("name") or row.get("title") or "")
+        price = row.get("price")
+        description = str(row.get("description") or "")
+        category = row.get("category")
+        img_path = row.get("img_path") or row.get("image_path")
+        if row.get("category_slug"):
+            derived = row
+        else:
+            derived = derive_product_fields(name, price, description, category)
+        price_display, price_text = _price_parts(
+            derived["price_prefix"] or "", derived["price_text"] or ""
+        )
+        if category is not None:
+            category = share(category)
         products.append(
             ProductView(
-                id=int(row.get("id")),
-                name=str(row.get("name") or row.get("title") or ""),
-                price=row.get("price"),
-                description=str(row.get("description") or ""),
-                category=row.get("category"),
-                img_path=row.get("img_path") or row.get("image_path"),
+                int(row.get("id")),
+                name,
+                price,
+                description,
+                category,
+                img_path,
+                derived["numeric_price"],
+                price_display,
+                price_text,
+                resolve_image_path(img_path),
+                share(derived["category_name"]),
+                share(derived["category_slug"]),
+                share(derived["category_key"]),
+                derived["name_key"],
+                derived["description_html"] or "",
             )
         )
     return products
 
 
-def ordered_categories(products: Sequence[ProductView]) -> List[dict[str, object]]:
+def category_group_key(value: Optional[str]) -> str:
+    """The home page group of a raw category value."""
+
+    return (value or "").strip() or UNCATEGORIZED
+
+
+def ordered_categories(
+    products: Sequence[ProductView], limit: Optional[int] = None
+) -> List[dict[str, object]]:
+    """Group ``products`` by category in home page order.
+
+    With ``limit`` each group keeps its first ``limit`` items; ``next_after``
+    is then the id to continue the group from, or ``None`` when nothing was
+    cut off.
+    """
+
     groups: dict[str, List[ProductView]] = {}
     for product in products:
-        key = (product.category or "").strip() or "Без категории"
-        groups.setdefault(key, []).append(product)
+        groups.setdefault(category_group_key(product.category), []).append(product)
 
     def category_order_key(name: str) -> tuple[int, str]:
         try:
@@ -248,17 +341,30 @@ def ordered_categories(products: Sequence[ProductView]) -> List[dict[str, object
 
     result: List[dict[str, object]] = []
     for key, items in entries:
+        next_after = None
+        if limit is not None and len(items) > limit:
+            items = items[:limit]
+            next_after = items[-1].id
         result.append(
             {
                 "key": key,
                 "display": display_category_name(key),
                 "slug": category_slug(key),
                 "items": items,
+                "next_after": next_after,
             }
         )
     return result
 
 
+def price_bounds(
+    minimum: Optional[float], maximum: Optional[float]
+) -> dict[str, int]:
+    if minimum is None or maximum is None or maximum <= 0:
+        return {"min": 0, "max": 0}
+    return {"min": int(minimum), "max": int(maximum)}
+
+
 def catalog_price_bounds(products: Sequence[ProductView]) -> dict[str, int]:
     minimum = math.inf
     maximum = 0
@@ -269,23 +375,44 @@ def catalog_price_bounds(products: Sequence[ProductView]) -> dict[str, int]:
         minimum = min(minimum, value)
         maximum = max(maximum, value)
 
-    if minimum is math.inf or maximum <= 0:
-        return {"min": 0, "max": 0}
-
-    return {"min": int(minimum), "max": int(maximum)}
+    if minimum is math.inf:
+        return price_bounds(None, None)
+    return price_bounds(minimum, maximum)
 
 
 def catalog_categories(products: Sequence[ProductView]) -> List[dict[str, object]]:
-    totals: dict[str, List[ProductView]] = {}
+    stats: dict[Optional[str], dict[str, object]] = {}
     for product in products:
-        slug = product.category_slug
-        totals.setdefault(slug, []).append(product)
+        entry = stats.setdefault(
+            product.category, {"category": product.category, "count": 0}
+        )
+        entry["count"] = int(entry["count"]) + 1
+    return catalog_categories_from_stats(list(stats.values()))
+
+
+def catalog_categories_from_stats(
+    stats: Sequence[dict[str, object]],
+) -> List[dict[str, object]]:
+    """Build the category facet from per-category counts.
+
+    ``stats`` rows carry a raw ``category`` value and its ``count`` and must
+    be ordered by the first product using that category; the first raw value
+    seen for a slug provides its label.
+    """
+
+    totals: dict[str, int] = {}
+    first_category: dict[str, Optional[str]] = {}
+    for entry in stats:
+        raw = entry.get("category")
+        slug = category_slug(raw)
+        totals[slug] = totals.get(slug, 0) + int(entry.get("count") or 0)
+        first_category.setdefault(slug, raw)
 
     result = [
         {
             "slug": "all",
             "label": "Все памятники",
-            "count": len(products),
+            "count": sum(totals.values()),
         }
     ]
 
@@ -293,36 +420,34 @@ def catalog_categories(products: Sequence[ProductView]) -> List[dict[str, object
 
     for preset in CATEGORY_PRESETS:
         slug = preset["slug"]
-        items = totals.get(slug, [])
         result.append(
             {
                 "slug": slug,
                 "label": preset["label"],
-                "count": len(items),
+                "count": totals.get(slug, 0),
             }
         )
         used.add(slug)
 
-    def sort_key(item: tuple[str, List[ProductView]]) -> tuple[int, str]:
-        slug, items = item
-        preset = _category_preset_by_slug(slug)
-        if preset:
-            return (CATEGORY_PRESETS.index(preset), preset["label"])
-        first = items[0] if items else None
+    def sort_key(slug: str) -> tuple[int, str]:
+        index = CATEGORY_PRESET_INDEX.get(slug)
+        if index is not None:
+            return (index, CATEGORY_PRESETS[index]["label"])
+        first = first_category.get(slug) or ""
         try:
-            fallback = CATEGORY_ORDER.index(first.category if first else "")
+            fallback = CATEGORY_ORDER.index(first)
         except ValueError:
             fallback = len(CATEGORY_ORDER)
-        return (fallback, category_label(first.category if first else ""))
+        return (fallback, category_label(first))
 
-    remaining = [(slug, items) for slug, items in totals.items() if slug not in used]
+    remaining = [slug for slug in totals if slug not in used]
 
-    for slug, items in sorted(remaining, key=sort_key):
+    for slug in sorted(remaining, key=sort_key):
         result.append(
             {
                 "slug": slug,
-                "label": category_label(items[0].category if items else ""),
-                "count": len(items),
+                "label": category_label(first_category.get(slug) or ""),
+                "count": totals[slug],
             }
         )
 
@@ -337,6 +462,12 @@ def apply_catalog_filters(
     price_from: Optional[int],
     price_to: Optional[int],
 ) -> List[ProductView]:
+    """Filter and sort ``products`` with a plain scan.
+
+    Pages are served by the indexed engines in :mod:`catalog_index` and
+    :mod:`catalog_columns`; this stays as the reference they must match.
+    """
+
     filtered: List[ProductView] = []
     price_active = (
         price_from is not None
@@ -362,17 +493,21 @@ def apply_catalog_filters(
                 continue
         filtered.append(product)
 
+    return _sort_products(filtered, sort)
+
+
+def _sort_products(filtered: List[ProductView], sort: str) -> List[ProductView]:
     def sort_key_price(item: ProductView) -> tuple[int, str]:
         value = item.numeric_price
         if value is None:
-            return (math.inf, item.name.lower())
-        return (int(value), item.name.lower())
+            return (math.inf, item.name_key)
+        return (int(value), item.name_key)
 
     def sort_key_name(item: ProductView) -> str:
-        return item.name.lower()
+        return item.name_key
 
     def sort_key_category(item: ProductView) -> tuple[str, str]:
-        return (item.category_name.lower(), item.name.lower())
+        return (item.category_key, item.name_key)
 
     if sort == "price-desc":
         filtered.sort(key=sort_key_price)
@@ -387,27 +522,91 @@ def apply_catalog_filters(
     return filtered
 
 
-def similar_products(
-    product: ProductView, products: Sequence[ProductView]
-) -> List[ProductView]:
-    same_category = [
-        item
-        for item in products
-        if item.id != product.id
-        and item.category_slug == product.category_slug
-    ]
-    if same_category:
-        return same_category
+class CatalogFacets(NamedTuple):
+    """One catalog page: matching products, category facet and price bounds.
+
+    Category counts respect the price filter but not the category filter,
+    so each entry says how many products selecting it would add.
+    """
+
+    products: List[ProductView]
+    categories: List[dict[str, object]]
+    bounds: dict[str, int]
+
+
+def category_facet_counts(
+    categories: Sequence[dict[str, object]], counts: Mapping[str, int]
+) -> List[dict[str, object]]:
+    """Return ``categories`` with counts replaced by ``counts`` per slug."""
 
-    standard = [
-        item
-        for item in products
-        if item.id != product.id and item.category_slug == category_slug("Стандартный")
+    result = [
+        {**entry, "count": counts.get(str(entry["slug"]), 0)}
+        for entry in categories
+        if entry["slug"] != "all"
     ]
-    if standard:
-        return standard
+    total = sum(int(entry["count"]) for entry in result)
+    return [{**categories[0], "count": total}] + result
+
+
+def catalog_facets(
+    products: Sequence[ProductView],
+    *,
+    categories: Sequence[str],
+    sort: str,
+    price_from: Optional[int],
+    price_to: Optional[int],
+) -> CatalogFacets:
+    """Filter ``products`` and count the facets in a single pass.
+
+    Gives the same products as :func:`apply_catalog_filters`, the bounds of
+    :func:`catalog_price_bounds` and the categories of
+    :func:`catalog_categories` with counts under the price filter.
+    """
+
+    price_active = (
+        price_from is not None
+        and price_to is not None
+        and price_to > price_from
+    )
+    category_filter = {
+        slug.strip().lower()
+        for slug in categories
+        if slug and slug.strip().lower() != "all"
+    }
 
-    return [item for item in products if item.id != product.id]
+    filtered: List[ProductView] = []
+    totals: dict[Optional[str], int] = {}
+    counts: dict[str, int] = {}
+    minimum = math.inf
+    maximum = 0
+    for product in products:
+        category = product.category
+        totals[category] = totals.get(category, 0) + 1
+
+        value = product.numeric_price
+        if value is not None:
+            if value < minimum:
+                minimum = value
+            if value > maximum:
+                maximum = value
+        if price_active and (value is None or not price_from <= value <= price_to):
+            continue
+
+        slug = product.category_slug
+        counts[slug] = counts.get(slug, 0) + 1
+        if not category_filter or slug in category_filter:
+            filtered.append(product)
+
+    facet = catalog_categories_from_stats(
+        [{"category": category, "count": count} for category, count in totals.items()]
+    )
+    if price_active:
+        facet = category_facet_counts(facet, counts)
+    if minimum is math.inf:
+        bounds = price_bounds(None, None)
+    else:
+        bounds = price_bounds(minimum, maximum)
+    return CatalogFacets(_sort_products(filtered, sort), facet, bounds)
 
 
 CATALOG_SORT_OPTIONS = (
@@ -417,6 +616,11 @@ CATALOG_SORT_OPTIONS = (
     {"value": "name", "label": "По названию", "icon": "letters"},
 )
 
+# Offered (and the default) only while the catalog shows search results.
+SEARCH_SORT_OPTIONS = (
+    {"value": "relevance", "label": "По релевантности", "icon": "search"},
+) + CATALOG_SORT_OPTIONS
+
 
 def clamp_price(value: Optional[int], *, bounds: dict[str, int]) -> Optional[int]:
     if value is None: